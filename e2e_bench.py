@@ -0,0 +1,389 @@
+"""Общая часть сквозных замеров benchmarks/bench_e2e.py обоих проектов.
+
+Проекты задают только свои данные и сценарии (BenchProject) и вызывают
+main(). Модуль не зависит от проекта: настройки Django выбираются
+в дочернем процессе по BenchProject.settings.
+
+Сценарий — один URL проекта: метод, путь и тело i-го запроса,
+а также cookie сессии пользователя. Сценарии гоняются двумя способами:
+    client — тестовый клиент Django в том же процессе;
+    wsgi   — настоящий HTTP через локальный многопоточный WSGI-сервер.
+Для каждого сценария считаются запросы в секунду, задержки p50, p95
+и p99, число запросов к базе из заголовка Server-Timing, который ставит
+QueryBudgetMiddleware, и пиковый RSS процесса. У потоковых ответов
+в заголовок попадают только запросы до начала потока.
+
+Каждый объём данных замеряется в отдельном процессе со своей временной
+базой, поэтому и RSS у каждого свой. Результат сравнивается с базовой
+линией в JSON: замер провален, если запросов в секунду стало меньше
+или p95 и память выросли больше чем на --threshold (с допуском SLACK),
+а также если выросло число запросов к базе или ошибок.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import django
+
+DRIVERS = ('client', 'wsgi')
+# Столько первых запросов сценария не входит в замер.
+WARMUP = 5
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+# Допуск сверх --threshold: доли миллисекунды и мегабайты памяти
+# колеблются от запуска к запуску и на быстрых страницах дают
+# ложные ухудшения. None — показатель должен совпасть точно.
+SLACK = {
+    'rps': 0,
+    'p95_ms': 2,
+    'peak_rss_mb': 10,
+    'queries': None,
+    'errors': None,
+}
+
+BenchProject = namedtuple(
+    'BenchProject', ('module', 'settings', 'sizes', 'baseline', 'seed')
+)
+Request = namedtuple('Request', ('method', 'path', 'body', 'content_type'))
+# make_request(i) строит i-й запрос; requests ограничивает число
+# запросов для дорогих сценариев.
+Scenario = namedtuple(
+    'Scenario', ('name', 'make_request', 'cookie', 'requests'),
+    defaults=('', None)
+)
+
+
+def get(path):
+    return Request('GET', path, b'', None)
+
+
+def post_form(path, data):
+    return Request(
+        'POST', path, urlencode(data).encode(),
+        'application/x-www-form-urlencoded'
+    )
+
+
+def post_json(path, data):
+    return Request(
+        'POST', path, json.dumps(data).encode(), 'application/json'
+    )
+
+
+def session_cookie(user):
+    """Заголовок Cookie с сессией вошедшего пользователя."""
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    value = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return f'{settings.SESSION_COOKIE_NAME}={value}'
+
+
+class ClientDriver:
+    """Тестовый клиент Django: без сети и без проверки CSRF."""
+    concurrency = 1
+
+    def __init__(self, concurrency):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+
+    def __call__(self, request, cookie):
+        # HTTP_COOKIE заменяет cookie, которые клиент запомнил сам.
+        response = self.client.generic(
+            request.method, request.path, request.body,
+            request.content_type or 'application/octet-stream',
+            HTTP_COOKIE=cookie
+        )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code, response.get('Server-Timing', '')
+
+    def close(self):
+        pass
+
+
+class WSGIDriver:
+    """HTTP через ThreadedWSGIServer из runserver в потоке процесса."""
+
+    def __init__(self, concurrency):
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.core.servers.basehttp import (
+            ThreadedWSGIServer, WSGIRequestHandler
+        )
+
+        class Handler(WSGIHandler):
+            def get_response(self, request):
+                # Как тестовый клиент: без токена CSRF.
+                request._dont_enforce_csrf_checks = True
+                return super().get_response(request)
+
+        class QuietRequestHandler(WSGIRequestHandler):
+            # Иначе заголовки и тело ответа ждут подтверждения
+            # отложенного ACK, и каждый ответ задерживается на 40 мс.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+        self.concurrency = concurrency
+        self.server = ThreadedWSGIServer(
+            ('127.0.0.1', 0), QuietRequestHandler
+        )
+        self.server.set_app(Handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.local = threading.local()
+
+    def connection(self):
+        """Соединение keep-alive, своё у каждого потока нагрузки."""
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = http.client.HTTPConnection(
+                *self.server.server_address
+            )
+        return self.local.connection
+
+    def __call__(self, request, cookie):
+        headers = {'Host': 'localhost'}
+        if cookie:
+            headers['Cookie'] = cookie
+        if request.content_type:
+            headers['Content-Type'] = request.content_type
+        connection = self.connection()
+        try:
+            connection.request(
+                request.method, request.path, request.body, headers
+            )
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            raise
+        return response.status, response.getheader('Server-Timing', '')
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+DRIVER_CLASSES = {'client': ClientDriver, 'wsgi': WSGIDriver}
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(driver, scenario, count, repeat, offset):
+    """Прогрев и repeat замеров сценария на запросах с номерами от offset.
+
+    Как в timeit, берётся самый быстрый замер: медленные замеры
+    говорят о соседях по машине, а не о коде.
+    """
+
+    def send(index):
+        request = scenario.make_request(offset + index)
+        start = time.perf_counter()
+        try:
+            status, server_timing = driver(request, scenario.cookie)
+        except (http.client.HTTPException, OSError):
+            status, server_timing = None, ''
+        latency = time.perf_counter() - start
+        match = QUERIES_PATTERN.search(server_timing)
+        ok = status is not None and status < 400
+        return latency, ok, int(match.group(1)) if match else 0
+
+    warmup = min(WARMUP, count)
+    rounds = []
+    with ThreadPoolExecutor(driver.concurrency) as executor:
+        list(executor.map(send, range(warmup)))
+        for start_index in range(warmup, warmup + count * repeat, count):
+            start = time.perf_counter()
+            samples = list(executor.map(
+                send, range(start_index, start_index + count)
+            ))
+            rounds.append((time.perf_counter() - start, samples))
+    elapsed, samples = min(rounds, key=lambda round_: round_[0])
+    latencies = sorted(latency for latency, _, _ in samples)
+    return {
+        'requests': count,
+        'errors': sum(not ok for _, ok, _ in samples),
+        'rps': round(count / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'queries': statistics.median(queries for _, _, queries in samples),
+        # ru_maxrss в Linux — в килобайтах.
+        'peak_rss_mb': round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def run_size(project, args):
+    """Выполняется в дочернем процессе: один объём, одна база."""
+    os.environ['DJANGO_SETTINGS_MODULE'] = project.settings
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    # Нагрузка идёт от одного пользователя, ограничитель её бы отклонил.
+    settings.RATE_LIMITS = {}
+    # Файловая база: сервер обслуживает запросы в своих потоках.
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        args.tmpdir, 'bench.sqlite3'
+    )
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        # Запросы каждого способа берут свои номера, чтобы не удалять
+        # то, что уже удалил предыдущий.
+        stride = WARMUP + args.requests * args.repeat
+        start = time.perf_counter()
+        scenarios = project.seed(args.size, stride * len(args.drivers))
+        result = {'seed_s': round(time.perf_counter() - start, 2)}
+        for number, name in enumerate(args.drivers):
+            driver = DRIVER_CLASSES[name](args.concurrency)
+            try:
+                result[name] = {
+                    scenario.name: measure(
+                        driver, scenario,
+                        min(args.requests, scenario.requests or args.requests),
+                        args.repeat, number * stride
+                    )
+                    for scenario in scenarios
+                }
+            finally:
+                driver.close()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print(json.dumps(result))
+
+
+def run_sizes(project, args):
+    results = {}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = subprocess.run(
+                [sys.executable, '-m', project.module,
+                 '--size', str(size), '--tmpdir', tmpdir,
+                 '--requests', str(args.requests),
+                 '--repeat', str(args.repeat),
+                 '--concurrency', str(args.concurrency),
+                 '--drivers', *args.drivers],
+                check=True, capture_output=True, text=True
+            ).stdout
+        results[str(size)] = result = json.loads(output.splitlines()[-1])
+        print(f'\nОбъём {size}, данные созданы за {result["seed_s"]} с')
+        print(f'{"способ":>7} {"сценарий":>18} {"запр./с":>9} '
+              f'{"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+              f'{"SQL":>5} {"RSS, МБ":>8} {"ошибок":>7}')
+        for driver in args.drivers:
+            for name, row in result[driver].items():
+                print(f'{driver:>7} {name:>18} {row["rps"]:>9.0f} '
+                      f'{row["p50_ms"]:>9.2f} {row["p95_ms"]:>9.2f} '
+                      f'{row["p99_ms"]:>9.2f} {row["queries"]:>5g} '
+                      f'{row["peak_rss_mb"]:>8.0f} {row["errors"]:>7}')
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """Показатели хуже базовой линии; сравниваются общие замеры."""
+    regressions = []
+    for size, drivers in results.items():
+        for driver in DRIVERS:
+            for name, row in drivers.get(driver, {}).items():
+                base = baseline.get(size, {}).get(driver, {}).get(name)
+                if base is None:
+                    continue
+                for metric, slack in SLACK.items():
+                    if slack is None:
+                        worse = row[metric] > base[metric]
+                    elif metric == 'rps':
+                        worse = row[metric] < base[metric] * (1 - threshold)
+                    else:
+                        worse = row[metric] > (
+                            base[metric] * (1 + threshold) + slack
+                        )
+                    if worse:
+                        regressions.append(
+                            f'{size} {driver} {name} {metric}: '
+                            f'{base[metric]} -> {row[metric]}'
+                        )
+    return regressions
+
+
+def main(project):
+    parser = argparse.ArgumentParser(
+        description=sys.modules['__main__'].__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=project.sizes
+    )
+    parser.add_argument(
+        '--drivers', nargs='+', choices=DRIVERS, default=DRIVERS
+    )
+    parser.add_argument(
+        '--requests', type=int, default=200,
+        help='запросов на сценарий после прогрева'
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='замеров сценария, в зачёт идёт самый быстрый'
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=1,
+        help='одновременных соединений с WSGI-сервером'
+    )
+    parser.add_argument('--baseline', default=project.baseline)
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='записать результат как новую базовую линию'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.25,
+        help='допустимое ухудшение, доля от базовой линии'
+    )
+    parser.add_argument('--output', help='куда сохранить результаты в JSON')
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--tmpdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.size is not None:
+        run_size(project, args)
+        return
+
+    results = run_sizes(project, args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f'\nБазовая линия записана в {args.baseline}')
+        return
+    try:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+    except FileNotFoundError:
+        print(f'\nБазовой линии {args.baseline} нет, сравнивать не с чем.')
+        return
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print('\nУхудшения относительно базовой линии:')
+        print('\n'.join(regressions))
+        sys.exit(1)
+    print('\nУхудшений относительно базовой линии нет.')
@@ -0,0 +1,229 @@
+"""Параллельный запуск проверок проекта.
+
+Проверяет то же, что run_tests.sh, но не по очереди: flake8,
+structure_test.py и тесты YaNews и YaNote выполняются одновременно,
+а тесты каждого проекта делятся на части по числу ядер. Каждая часть —
+отдельный процесс pytest со своим DJANGO_SETTINGS_MODULE и своей
+тестовой базой: тестовую базу SQLite Django создаёт в памяти процесса,
+а временные файлы тестов лежат в отдельном --basetemp.
+
+Тесты делятся по модулям и классам: setUpTestData выполняется один
+раз на класс, и дробить класс между процессами невыгодно. Части
+собираются жадно по длительности групп из прошлого запуска
+(файл .test_durations.json), новые группы оцениваются по числу тестов.
+
+Запуск из корня репозитория:
+    python run_tests_parallel.py [--jobs N] [--compare]
+
+С --compare перед параллельным запуском выполняется run_tests.sh
+и печатается ускорение относительно него.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+DURATIONS_PATH = BASE_DIR / '.test_durations.json'
+# Оценка для теста, который ещё ни разу не запускался.
+DEFAULT_TEST_TIME = 0.05
+
+Project = namedtuple('Project', ('name', 'directory', 'settings'))
+Shard = namedtuple('Shard', ('project', 'number', 'groups', 'weight'))
+Result = namedtuple('Result', ('title', 'returncode', 'elapsed', 'output'))
+
+PROJECTS = (
+    Project('ya_news', BASE_DIR / 'ya_news', 'yanews.settings'),
+    Project('ya_note', BASE_DIR / 'ya_note', 'yanote.settings'),
+)
+
+
+def project_env(project):
+    """Окружение процесса: настройки проекта, а не унаследованные."""
+    return {**os.environ, 'DJANGO_SETTINGS_MODULE': project.settings}
+
+
+def pytest_command(project, *args):
+    return (
+        sys.executable, '-m', 'pytest', f'--ds={project.settings}', *args
+    )
+
+
+def group_key(node_id):
+    """Модуль для функций, модуль и класс для методов классов."""
+    parts = node_id.split('::')
+    return '::'.join(parts[:2]) if len(parts) > 2 else parts[0]
+
+
+def collect(project):
+    """Число тестов в каждой группе проекта."""
+    # addopts в pytest.ini включает -vv, а список id печатается при -q.
+    completed = subprocess.run(
+        pytest_command(project, '--collect-only', '-qqq'),
+        cwd=project.directory, env=project_env(project),
+        capture_output=True, text=True
+    )
+    if completed.returncode:
+        raise SystemExit(
+            f'Не удалось собрать тесты {project.name}:\n{completed.stdout}'
+        )
+    return Counter(
+        group_key(line) for line in completed.stdout.splitlines()
+        if '::' in line
+    )
+
+
+def junit_classname(key):
+    """Так группу называет отчёт JUnit XML."""
+    path, _, test_class = key.partition('::')
+    module = path[:-len('.py')].replace('/', '.')
+    return f'{module}.{test_class}' if test_class else module
+
+
+def make_shards(project, groups, jobs, durations):
+    """Раскладывает группы по частям, начиная с самых долгих."""
+    weights = {
+        key: durations.get(
+            f'{project.name}:{key}', count * DEFAULT_TEST_TIME
+        )
+        for key, count in groups.items()
+    }
+    shards = [[] for _ in range(min(jobs, len(groups)))]
+    loads = [0.0] * len(shards)
+    for key in sorted(weights, key=weights.get, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(key)
+        loads[lightest] += weights[key]
+    return [
+        Shard(project, number, keys, load)
+        for number, (keys, load) in enumerate(zip(shards, loads), 1)
+    ]
+
+
+def run_command(title, command, cwd=BASE_DIR, env=None):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        command, cwd=cwd, env=env, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, text=True
+    )
+    return Result(
+        title, completed.returncode, time.perf_counter() - start,
+        completed.stdout
+    )
+
+
+def run_shard(shard, durations):
+    """Запускает часть тестов и записывает длительности её групп."""
+    project = shard.project
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report = Path(tmpdir) / 'report.xml'
+        result = run_command(
+            f'{project.name} [{shard.number}]',
+            pytest_command(
+                project, '-q', '--tb=short', f'--basetemp={tmpdir}/tmp',
+                f'--junitxml={report}', *shard.groups
+            ),
+            cwd=project.directory, env=project_env(project)
+        )
+        if report.exists():
+            times = Counter()
+            for case in ElementTree.parse(report).iter('testcase'):
+                times[case.get('classname')] += float(case.get('time', 0))
+            for key in shard.groups:
+                if junit_classname(key) in times:
+                    durations[f'{project.name}:{key}'] = round(
+                        times[junit_classname(key)], 3
+                    )
+    return result
+
+
+def read_durations():
+    try:
+        return json.loads(DURATIONS_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def run_serial():
+    print('Последовательный запуск run_tests.sh...')
+    # tput в run_tests.sh без терминала не знает его ширины.
+    result = run_command(
+        'run_tests.sh', ('bash', 'run_tests.sh'),
+        env={**os.environ, 'TERM': os.environ.get('TERM', 'dumb')}
+    )
+    status = 'ok' if result.returncode == 0 else 'ошибка'
+    print(f'run_tests.sh: {result.elapsed:.1f} с, {status}')
+    return result
+
+
+def run_parallel(jobs):
+    durations = read_durations()
+    with ThreadPoolExecutor(len(PROJECTS)) as executor:
+        groups = dict(zip(PROJECTS, executor.map(collect, PROJECTS)))
+    shards = [
+        shard for project in PROJECTS
+        for shard in make_shards(project, groups[project], jobs, durations)
+    ]
+    shards.sort(key=lambda shard: shard.weight, reverse=True)
+    with ThreadPoolExecutor(jobs) as executor:
+        futures = [
+            executor.submit(
+                run_command, 'flake8',
+                (sys.executable, '-m', 'flake8', '--config=setup.cfg')
+            ),
+            executor.submit(
+                run_command, 'structure_test.py',
+                (sys.executable, 'structure_test.py')
+            ),
+        ] + [executor.submit(run_shard, shard, durations) for shard in shards]
+        results = [future.result() for future in futures]
+    DURATIONS_PATH.write_text(
+        json.dumps(durations, indent=2, sort_keys=True), encoding='utf-8'
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=os.cpu_count() or 1,
+        help='сколько процессов запускать одновременно'
+    )
+    parser.add_argument(
+        '--compare', action='store_true',
+        help='сначала выполнить run_tests.sh и сравнить время'
+    )
+    args = parser.parse_args()
+
+    serial = run_serial() if args.compare else None
+    start = time.perf_counter()
+    results = run_parallel(max(1, args.jobs))
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result.returncode]
+    for result in failed:
+        print(f'\n===== {result.title} =====\n{result.output}')
+    for result in results:
+        lines = result.output.strip().splitlines()
+        summary = lines[-1] if lines else ''
+        status = 'ошибка' if result.returncode else 'ok'
+        print(f'{result.title:>20} {result.elapsed:>6.1f} с {status:>6}  '
+              f'{summary}')
+    print(f'Параллельно, {args.jobs} процессов: {elapsed:.1f} с')
+    if serial is not None:
+        print(f'Ускорение относительно run_tests.sh: '
+              f'{serial.elapsed / elapsed:.2f}x')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
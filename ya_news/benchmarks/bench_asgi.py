@@ -0,0 +1,235 @@
+"""Пропускная способность WSGI и ASGI при тысяче одновременных клиентов.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_asgi --concurrency 1000 --requests 20000
+
+Настоящего сервера нет, его заменяет цикл asyncio в этом же процессе.
+Клиенты — корутины, которые по очереди запрашивают главную и страницы
+новостей и не начинают новый запрос, пока не получили ответ.
+Режимы запускаются в отдельных процессах:
+    wsgi        — WSGIHandler в пуле из --workers потоков, как gthread;
+    asgi-sync   — ASGIHandler с синхронными представлениями;
+    asgi-async  — ASGIHandler с news.async_views.
+--client-delay имитирует медленного клиента, который дочитывает ответ:
+под WSGI всё это время занят поток, под ASGI — только корутина.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import django
+
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+NEWS_COUNT = 10
+COMMENTS_PER_NEWS = 50
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.create(username='bench')
+    # SQLite в bulk_create не возвращает первичные ключи.
+    news_list = [
+        News.objects.create(title=f'Новость {index}', text='Просто текст.')
+        for index in range(NEWS_COUNT)
+    ]
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for news in news_list
+        for index in range(COMMENTS_PER_NEWS)
+    )
+    return ['/'] + [f'/news/{news.pk}/' for news in news_list]
+
+
+def wsgi_environ(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+
+
+def wsgi_client(application, delay):
+    """Один запрос целиком занимает рабочий поток."""
+
+    def request(path):
+        statuses = []
+        body = b''.join(application(
+            wsgi_environ(path),
+            lambda status, headers: statuses.append(status)
+        ))
+        if delay:
+            time.sleep(delay)
+        return statuses[0].startswith('200') and bool(body)
+
+    return request
+
+
+def asgi_scope(path):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+async def asgi_request(application, path, delay):
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif delay and not message.get('more_body'):
+            await asyncio.sleep(delay)
+
+    await application(asgi_scope(path), receive, send)
+    return status == 200
+
+
+async def load(handle, paths, concurrency, total):
+    """Гоняет concurrency клиентов, пока не наберётся total запросов."""
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def client(offset):
+        nonlocal errors, issued
+        while issued < total:
+            path = paths[(issued + offset) % len(paths)]
+            issued += 1
+            start = time.perf_counter()
+            if not await handle(path):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def run_mode(args):
+    """Выполняется в дочернем процессе: один режим, одна база."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    # Файловая база: в памяти SQLite плохо переносит много потоков.
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        args.tmpdir, 'bench.sqlite3'
+    )
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        paths = seed()
+        if args.mode == 'wsgi':
+            application = get_wsgi_application()
+            pool = ThreadPoolExecutor(max_workers=args.workers)
+            request = wsgi_client(application, args.client_delay)
+
+            async def handle(path):
+                return await asyncio.get_running_loop().run_in_executor(
+                    pool, request, path
+                )
+        else:
+            application = get_asgi_application()
+
+            async def handle(path):
+                return await asyncio.wait_for(
+                    asgi_request(application, path, args.client_delay),
+                    args.timeout
+                )
+
+        # Прогрев: шаблоны, соединения, кеш фрагментов.
+        asyncio.run(load(handle, paths, len(paths), len(paths)))
+        result = asyncio.run(
+            load(handle, paths, args.concurrency, args.requests)
+        )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=MODES)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--client-delay', type=float, default=0.0)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--output', help='куда сохранить результаты в JSON')
+    parser.add_argument('--tmpdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    results = {}
+    print(f'{"режим":>12} {"запросов/с":>11} {"p50, мс":>9} '
+          f'{"p99, мс":>9} {"ошибок":>7}')
+    for mode in args.modes:
+        env = dict(
+            os.environ,
+            NEWS_ASYNC_VIEWS='1' if mode == 'asgi-async' else '0'
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_asgi',
+                 '--mode', mode, '--tmpdir', tmpdir,
+                 '--concurrency', str(args.concurrency),
+                 '--requests', str(args.requests),
+                 '--workers', str(args.workers),
+                 '--client-delay', str(args.client_delay),
+                 '--timeout', str(args.timeout)],
+                env=env, check=True, capture_output=True, text=True
+            ).stdout
+        result = results[mode] = json.loads(output.splitlines()[-1])
+        print(f'{mode:>12} {result["rps"]:>11.0f} {result["p50_ms"]:>9.1f} '
+              f'{result["p99_ms"]:>9.1f} {result["errors"]:>7}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Накладные расходы диспетчеризации страницы новости.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_dispatch --number 20000
+
+Сравнивается прежний NewsDetailView, собиравший as_view() вложенного
+представления на каждый запрос, с нынешним, где представления для
+методов собраны один раз. Обработчики get и post вложенных
+представлений подменены и сразу возвращают готовый ответ, так что
+замеряется только путь от вызова представления до обработчика,
+без базы и шаблонов.
+"""
+import argparse
+import os
+import timeit
+from unittest import mock
+
+import django
+
+
+def make_per_request_view():
+    """Прежняя реализация NewsDetailView."""
+    from django.views import generic
+
+    from news.views import NewsComment, NewsDetail
+
+    class PerRequestDetailView(generic.View):
+
+        def get(self, request, *args, **kwargs):
+            view = NewsDetail.as_view()
+            return view(request, *args, **kwargs)
+
+        def post(self, request, *args, **kwargs):
+            view = NewsComment.as_view()
+            return view(request, *args, **kwargs)
+
+    return PerRequestDetailView.as_view()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from news.views import NewsComment, NewsDetail, NewsDetailView
+
+    response = HttpResponse()
+    factory = RequestFactory()
+    requests = {
+        'GET': factory.get('/news/1/'),
+        'POST': factory.post('/news/1/'),
+    }
+    # LoginRequiredMixin пропускает POST только от пользователя.
+    for request in requests.values():
+        request.user = get_user_model()(username='bench')
+    views = {
+        'каждый запрос': make_per_request_view(),
+        'один раз': NewsDetailView.as_view(),
+    }
+
+    def handler(self, request, *args, **kwargs):
+        return response
+
+    with mock.patch.object(NewsDetail, 'get', handler), \
+            mock.patch.object(NewsComment, 'post', handler):
+        for method, request in requests.items():
+            for name, view in views.items():
+                best = min(timeit.repeat(
+                    lambda: view(request, pk=1),
+                    number=args.number, repeat=args.repeat
+                )) / args.number
+                print(
+                    f'{method:>4} as_view() {name:>13}: '
+                    f'{best * 1e6:7.2f} мкс на запрос'
+                )
+
+
+if __name__ == '__main__':
+    main()
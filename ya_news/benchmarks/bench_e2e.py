@@ -0,0 +1,124 @@
+"""Сквозной замер всех URL приложения news.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_e2e --sizes 10 1000 100000
+    python -m benchmarks.bench_e2e --save-baseline
+
+Для объёма N создаются N новостей по COMMENTS_PER_NEWS комментариев,
+а у самой свежей новости, страницу которой открывают сценарии, —
+N комментариев. Удаляемые комментарии лежат у самой старой новости,
+чтобы не менять замеряемые страницы. Результат сравнивается
+с benchmarks/baseline_e2e.json, подробности — в e2e_bench.py
+в корне репозитория.
+"""
+import os
+import sys
+
+# Общая часть замеров одна на оба проекта и лежит в корне репозитория.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+))))
+
+from e2e_bench import (  # noqa: E402
+    BenchProject, Scenario, get, main, post_form, session_cookie
+)
+
+COMMENTS_PER_NEWS = 3
+SEQUENCE = (
+    'WITH RECURSIVE seq(n) AS ('
+    ' SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < %s - 1'
+    ') '
+)
+
+
+def insert_comments(cursor, news_filter, author_id, text, count, created):
+    """По count комментариев к каждой новости из news_filter."""
+    cursor.execute(
+        SEQUENCE + 'INSERT INTO news_comment '
+        '(news_id, author_id, text, created) '
+        f'SELECT news.id, %s, %s || seq.n, %s FROM news_news AS news, seq '
+        f'WHERE {news_filter}',
+        (count, author_id, text, created)
+    )
+
+
+def seed(size, capacity):
+    # Через модели большие объёмы создавались бы слишком долго.
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.create(username='bench')
+    created = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEQUENCE + 'INSERT INTO news_news (title, text, date) '
+            "SELECT 'Новость ' || n, 'Просто текст новости.', "
+            "date('now', '-' || n || ' days') FROM seq",
+            (size,)
+        )
+        insert_comments(
+            cursor, '1', author.pk, 'Комментарий ', COMMENTS_PER_NEWS, created
+        )
+    latest = News.objects.order_by('-date', 'pk').first()
+    oldest = News.objects.order_by('date', 'pk').first()
+    with connection.cursor() as cursor:
+        insert_comments(
+            cursor, f'news.id = {latest.pk}', author.pk, 'Обсуждение ',
+            size, created
+        )
+        insert_comments(
+            cursor, f'news.id = {oldest.pk}', author.pk, 'Удаляемый ',
+            capacity, created
+        )
+    deletable = list(Comment.objects.filter(
+        news=oldest, text__startswith='Удаляемый '
+    ).order_by('pk').values_list('pk', flat=True))
+    edited = Comment.objects.create(
+        news=latest, author=author, text='Редактируемый'
+    )
+    cookie = session_cookie(author)
+    detail_url = reverse('news:detail', args=(latest.pk,))
+    return [
+        Scenario('home', lambda i: get(reverse('news:home'))),
+        Scenario('detail', lambda i: get(detail_url)),
+        Scenario(
+            'comments',
+            lambda i: get(reverse('news:comments', args=(latest.pk,)))
+        ),
+        Scenario(
+            'detail:post',
+            lambda i: post_form(detail_url, {'text': f'Новый {i}'}),
+            cookie
+        ),
+        Scenario(
+            'edit:post',
+            lambda i: post_form(
+                reverse('news:edit', args=(edited.pk,)),
+                {'text': f'Правка {i}'}
+            ),
+            cookie
+        ),
+        Scenario(
+            'delete:post',
+            lambda i: post_form(
+                reverse('news:delete', args=(deletable[i],)), {}
+            ),
+            cookie
+        ),
+    ]
+
+
+PROJECT = BenchProject(
+    module='benchmarks.bench_e2e',
+    settings='yanews.settings',
+    sizes=(10, 1000, 100000),
+    baseline=os.path.join(os.path.dirname(__file__), 'baseline_e2e.json'),
+    seed=seed,
+)
+
+if __name__ == '__main__':
+    main(PROJECT)
@@ -0,0 +1,47 @@
+"""Сравнение матчеров запрещённых слов.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_profanity --words 5000 --length 2000
+"""
+import argparse
+import random
+import timeit
+
+from news.profanity import AhoCorasickMatcher, SubstringMatcher
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rng, min_length=4, max_length=10):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = [random_word(rng) for _ in range(args.words)]
+    # Чистый текст: худший случай, оба матчера проходят его до конца.
+    text = ' '.join(
+        random_word(rng, 2, 3) for _ in range(args.length // 3)
+    )
+    print(f'Слов: {args.words}, длина текста: {len(text)}')
+    for matcher_class in (SubstringMatcher, AhoCorasickMatcher):
+        build = timeit.timeit(lambda: matcher_class(words), number=1)
+        matcher = matcher_class(words)
+        search = timeit.timeit(
+            lambda: matcher.search(text), number=args.repeat
+        ) / args.repeat
+        print(
+            f'{matcher_class.__name__:>20}: сборка {build * 1000:8.2f} мс, '
+            f'проверка {search * 1000:8.3f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main()
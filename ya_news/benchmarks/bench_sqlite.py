@@ -0,0 +1,168 @@
+"""Чтение и запись в SQLite из нескольких процессов.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_sqlite --readers 8 --writers 2 --duration 10
+
+Читатели повторяют запросы главной и страницы новости, писатели
+добавляют комментарии. Каждая операция оформлена как HTTP-запрос:
+до и после неё вызывается close_old_connections(). Сравниваются
+стандартный бэкенд без CONN_MAX_AGE и yanews.backends.sqlite3
+с постоянными соединениями, каждый на своём файле базы.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+import django
+
+CONFIGS = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+    },
+    'tuned': {
+        'ENGINE': 'yanews.backends.sqlite3',
+        'CONN_MAX_AGE': 60,
+    },
+}
+NEWS_COUNT = 10
+COMMENTS_PER_NEWS = 50
+
+
+def setup(config, path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default'].update(CONFIGS[config], NAME=path)
+    django.setup()
+
+
+def prepare(config, path):
+    """Создаёт схему и данные в отдельном процессе."""
+    setup(config, path)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='bench')
+    for index in range(NEWS_COUNT):
+        news = News.objects.create(title=f'Новость {index}', text='Текст.')
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {number}')
+            for number in range(COMMENTS_PER_NEWS)
+        )
+
+
+def worker(config, path, role, deadline, results):
+    setup(config, path)
+    from django.conf import settings
+    from django.db import OperationalError, close_old_connections
+
+    from news.models import Comment, News
+
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    author_id = Comment.objects.values_list('author_id', flat=True)[0]
+    close_old_connections()
+    latencies = []
+    errors = 0
+    index = 0
+    while time.monotonic() < deadline:
+        news_id = news_ids[index % len(news_ids)]
+        index += 1
+        start = time.perf_counter()
+        close_old_connections()
+        try:
+            if role == 'reader':
+                list(News.objects.with_comment_count()[
+                    :settings.NEWS_COUNT_ON_HOME_PAGE
+                ])
+                list(Comment.objects.filter(
+                    news_id=news_id
+                ).select_related('author')[:settings.COMMENTS_PAGE_SIZE])
+            else:
+                Comment.objects.create(
+                    news_id=news_id, author_id=author_id, text='Новый'
+                )
+        except OperationalError:
+            errors += 1
+        finally:
+            close_old_connections()
+        latencies.append(time.perf_counter() - start)
+    results.put((role, latencies, errors))
+
+
+def run(config, args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.sqlite3')
+        context = multiprocessing.get_context('spawn')
+        process = context.Process(target=prepare, args=(config, path))
+        process.start()
+        process.join()
+        results = context.Queue()
+        # Время на запуск интерпретаторов не входит в замер.
+        deadline = time.monotonic() + 2 + args.duration
+        roles = ['reader'] * args.readers + ['writer'] * args.writers
+        processes = [
+            context.Process(
+                target=worker,
+                args=(config, path, role, deadline, results)
+            )
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    summary = {}
+    for role in ('reader', 'writer'):
+        latencies = sorted(
+            latency for kind, values, _ in collected if kind == role
+            for latency in values
+        )
+        if not latencies:
+            continue
+        summary[role] = {
+            'ops': len(latencies) / args.duration,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+            'errors': sum(
+                errors for kind, _, errors in collected if kind == role
+            ),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument(
+        '--configs', nargs='+', choices=CONFIGS, default=tuple(CONFIGS)
+    )
+    parser.add_argument('--output', help='куда сохранить результаты в JSON')
+    args = parser.parse_args()
+
+    results = {}
+    print(f'{"бэкенд":>8} {"роль":>7} {"опер./с":>9} {"p50, мс":>9} '
+          f'{"p99, мс":>9} {"ошибок":>7}')
+    for config in args.configs:
+        results[config] = run(config, args)
+        for role, result in results[config].items():
+            print(f'{config:>8} {role:>7} {result["ops"]:>9.0f} '
+                  f'{result["p50_ms"]:>9.2f} {result["p99_ms"]:>9.2f} '
+                  f'{result["errors"]:>7}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
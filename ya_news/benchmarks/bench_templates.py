@@ -0,0 +1,103 @@
+"""Время отрисовки страниц без кеша шаблонов и с ним.
+
+Запуск из каталога ya_news:
+    python -m benchmarks.bench_templates --number 500
+
+Профиль «разработка» — TEMPLATES из yanews/settings.py с DEBUG = True:
+шаблоны читаются с диска и разбираются при каждой отрисовке.
+Профиль «рабочий» — TEMPLATES из yanews/settings_production.py:
+cached.Loader, прогретый так же, как при старте процесса. Замеряется
+то же, что делает представление: get_template() и render() с запросом,
+без обращений к базе.
+"""
+import argparse
+import os
+import time
+import timeit
+from datetime import date
+
+import django
+
+COMMENTS = 50
+
+
+def make_backend(templates, debug):
+    from django.template.backends.django import DjangoTemplates
+
+    params = {**templates[0], 'NAME': 'django'}
+    del params['BACKEND']
+    params['OPTIONS'] = {**params['OPTIONS'], 'debug': debug}
+    return DjangoTemplates(params)
+
+
+def make_pages(backend):
+    """Шаблон и контекст для главной, страницы новости и входа."""
+    from django.contrib.auth.forms import AuthenticationForm
+
+    from news.caching import CachedComment
+    from news.forms import CommentForm
+    from news.models import News
+
+    news_list = [
+        News(pk=pk, title=f'Новость {pk}', text='Текст.', date=date.today())
+        for pk in range(1, 11)
+    ]
+    card = backend.get_template('news/home_card.html')
+    for news in news_list:
+        news.comment_count = 3
+        news.card = card.render({'news': news})
+    comment = backend.get_template('news/comment.html')
+    comments = [
+        CachedComment(pk, 1, comment.render({'comment': {
+            'text': f'Комментарий {pk}', 'author': {'username': 'bench'},
+        }}))
+        for pk in range(1, COMMENTS + 1)
+    ]
+    return {
+        'home': ('news/home.html', {'object_list': news_list}),
+        'detail': ('news/detail.html', {
+            'news': news_list[0], 'comments': comments,
+            'next_cursor': 'cursor', 'form': CommentForm(),
+        }),
+        'login': ('registration/login.html', {'form': AuthenticationForm()}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+
+    # Ключ рабочему профилю обязателен, а для отрисовки безразличен.
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'bench_templates')
+    from yanews import settings, settings_production
+    from yanews.template_cache import project_template_names
+
+    request = RequestFactory().get('/')
+    request.user = get_user_model()(pk=1, username='bench')
+    profiles = {
+        'разработка': make_backend(settings.TEMPLATES, debug=True),
+        'рабочий': make_backend(settings_production.TEMPLATES, debug=False),
+    }
+    for profile, backend in profiles.items():
+        start = time.perf_counter()
+        for name in project_template_names(backend.engine):
+            backend.get_template(name)
+        warmup = time.perf_counter() - start
+        print(f'{profile}: загрузка всех шаблонов {warmup * 1000:.1f} мс')
+        for page, (name, context) in make_pages(backend).items():
+            best = min(timeit.repeat(
+                lambda: backend.get_template(name).render(context, request),
+                number=args.number, repeat=args.repeat
+            )) / args.number
+            print(f'{page:>10}: {best * 1000:7.3f} мс на отрисовку')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,96 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
 from .models import Comment, News
 
 
-class CommentInline(admin.StackedInline):
+class LatestCommentFormSet(BaseInlineFormSet):
+    """Только последние комментарии новости, а не вся ветка.
+
+    При сохранении берутся ровно те комментарии, формы которых были
+    на странице: новые комментарии, появившиеся за это время, не
+    сдвигают формы на чужие строки.
+    """
+    limit = 20
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            queryset = self.queryset.select_related('author').order_by(
+                '-created', '-pk'
+            )
+            if self.is_bound:
+                queryset = queryset.filter(pk__in=self.submitted_pks())
+            else:
+                queryset = queryset[:self.limit]
+            self._queryset = queryset
+        return self._queryset
+
+    def submitted_pks(self):
+        pk_field = self.model._meta.pk
+        pks = []
+        for index in range(self.initial_form_count()):
+            try:
+                pks.append(pk_field.to_python(
+                    self.data.get(f'{self.add_prefix(index)}-{pk_field.name}')
+                ))
+            except ValidationError:
+                # Такую форму отклонит сам формсет.
+                pass
+        return pks
+
+
+class CommentInline(admin.TabularInline):
+    """Модерация последних комментариев на странице новости.
+
+    Автор только показывается: выпадающий список всех пользователей
+    на каждую строку страница бы не выдержала. Комментарии пишут
+    на сайте, вся ветка со страницами — в разделе комментариев.
+    """
     model = Comment
+    formset = LatestCommentFormSet
+    fields = ('author', 'text', 'created')
+    readonly_fields = ('author', 'created')
     extra = 0
 
+    def has_add_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date', 'comment_count')
+    # Фильтр по датам идёт по индексу news_date_id_idx.
+    date_hierarchy = 'date'
+    readonly_fields = ('all_comments',)
     inlines = [
         CommentInline,
     ]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_comment_count()
+
+    @admin.display(description='Комментариев', ordering='comment_count')
+    def comment_count(self, obj):
+        return obj.comment_count
+
+    @admin.display(description='Все комментарии')
+    def all_comments(self, obj):
+        if obj.pk is None:
+            return '—'
+        url = reverse('admin:news_comment_changelist')
+        return format_html(
+            '<a href="{}?news__id__exact={}">{} шт.</a>',
+            url, obj.pk, obj.comment_count
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'author')
+    # Полный COUNT(*) всей таблицы на каждой странице списка не нужен.
+    show_full_result_count = False
@@ -0,0 +1,59 @@
+"""Асинхронные варианты страниц новостей для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, а синхронное представление под
+ASGI выполняется в единственном общем потоке. Поэтому представления
+ниже сами асинхронные, а работу с базой и отрисовку шаблона
+отдают в отдельный ограниченный пул потоков NEWS_ASYNC_DB_THREADS.
+Медленный клиент при этом держит только корутину, а не поток.
+
+Подключаются в news/urls.py при NEWS_ASYNC_VIEWS = True.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .views import NewsDetailView, NewsList
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.NEWS_ASYNC_DB_THREADS,
+    thread_name_prefix='news-db',
+)
+
+
+def in_db_thread(view):
+    """Асинхронная обёртка, выполняющая view в пуле потоков базы."""
+
+    def run(request, *args, **kwargs):
+        # Сигналы начала и конца запроса приходят в другой поток,
+        # поэтому соединения этого потока обслуживаем сами.
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                start = time.perf_counter()
+                response.render()
+                if hasattr(request, 'query_budget_render_time'):
+                    request.query_budget_render_time = (
+                        time.perf_counter() - start
+                    )
+            return response
+        finally:
+            close_old_connections()
+
+    run_async = sync_to_async(
+        run, thread_sensitive=False, executor=db_executor
+    )
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run_async(request, *args, **kwargs)
+
+    return async_view
+
+
+news_list = in_db_thread(NewsList.as_view())
+news_detail = in_db_thread(NewsDetailView.as_view())
@@ -0,0 +1,155 @@
+"""Кеш отрисованных фрагментов страниц новостей.
+
+У каждой новости в кеше хранится версия. Сигналы меняют её при любом
+изменении новости или её комментариев, и фрагменты старой версии
+просто перестают находиться. Версию нужно читать до запроса данных:
+тогда данные, прочитанные до изменения, не попадут под новую версию.
+
+Кеш у каждого процесса свой, поэтому в ключ страницы комментариев
+входят ещё число комментариев и наибольший id из базы: новый или
+удалённый комментарий виден сразу во всех процессах. Правка текста
+в другом процессе видна здесь через NEWS_FRAGMENT_CACHE_TIMEOUT.
+
+Главная страница хранится в кеше целиком: снимок — вычисленный
+QuerySet последних новостей с уже отрисованными карточками, который
+после распаковки не обращается к базе. Запись новостей и комментариев
+в этом процессе пересобирает снимок, но не чаще раза в
+HOME_SNAPSHOT_DEBOUNCE секунд. Кеш у каждого процесса свой, и о записи
+в другом процессе или в manage.py import_news сигналы здесь
+не узнают. Поэтому снимок старше HOME_SNAPSHOT_MAX_STALENESS секунд
+пересобирает первый же запрос главной, что бы ни случилось. Если
+карточки при этом не изменились, версия снимка остаётся прежней
+и условные запросы главной по-прежнему получают 304.
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from .models import News
+from .pagination import CommentPage, decode_cursor
+
+HOME_SNAPSHOT_KEY = 'news:home:snapshot'
+
+CachedComment = namedtuple('CachedComment', ('pk', 'author_id', 'html'))
+HomeSnapshot = namedtuple('HomeSnapshot', ('news_list', 'version', 'built'))
+
+
+def version_key(news_id):
+    return f'news:{news_id}:version'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def get_or_create_versions(keys):
+    """Версии по ключам; отсутствующие в кеше заводятся заново."""
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def get_versions(news_ids):
+    keys = {version_key(news_id): news_id for news_id in news_ids}
+    versions = get_or_create_versions(keys)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_version(news_id):
+    return get_versions((news_id,))[news_id]
+
+
+def bump_version(news_id):
+    """Новость или её комментарии изменились."""
+    cache.set(version_key(news_id), new_version(), None)
+
+
+def build_home_snapshot():
+    """Читает новости главной и сохраняет снимок в кеш."""
+    previous = cache.get(HOME_SNAPSHOT_KEY)
+    news_list = News.objects.with_comment_count()[
+        :settings.NEWS_COUNT_ON_HOME_PAGE
+    ]
+    template = get_template('news/home_card.html')
+    for news in news_list:
+        news.card = template.render({'news': news})
+    cards = [news.card for news in news_list]
+    if previous is not None and cards == [
+        news.card for news in previous.news_list
+    ]:
+        version = previous.version
+    else:
+        version = new_version()
+    snapshot = HomeSnapshot(news_list, version, time.time())
+    cache.set(HOME_SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def get_home_snapshot():
+    """Снимок главной; отсутствующий или слишком старый пересобирается."""
+    snapshot = cache.get(HOME_SNAPSHOT_KEY)
+    if snapshot is None or (
+        time.time() - snapshot.built > settings.HOME_SNAPSHOT_MAX_STALENESS
+    ):
+        return build_home_snapshot()
+    return snapshot
+
+
+def home_changed(news_id=None):
+    """Изменились новости или комментарии к новости news_id.
+
+    Без news_id изменение может затронуть любую новость главной,
+    например, если новости добавлены bulk_create() в обход сигналов.
+    """
+    snapshot = cache.get(HOME_SNAPSHOT_KEY)
+    if snapshot is None:
+        # Снимок соберёт первый запрос главной.
+        return
+    if news_id is not None and all(
+        news.pk != news_id for news in snapshot.news_list
+    ):
+        return
+    if time.time() - snapshot.built < settings.HOME_SNAPSHOT_DEBOUNCE:
+        # Изменение попадёт в снимок, когда тот устареет.
+        return
+    build_home_snapshot()
+
+
+def render_comments(comments):
+    """Отрисовывает комментарии без ссылок, зависящих от пользователя."""
+    template = get_template('news/comment.html')
+    return [
+        CachedComment(
+            comment.pk,
+            comment.author_id,
+            template.render({'comment': comment})
+        )
+        for comment in comments
+    ]
+
+
+def get_cached_comment_page(news_id, state, cursor, build_page):
+    """Страница ветки комментариев из кеша или из build_page().
+
+    state — состояние новости из conditional.get_news_state(): число
+    комментариев и наибольший id из базы вместе с версией новости.
+    """
+    if cursor is not None:
+        # В ключ попадают только корректные курсоры.
+        decode_cursor(cursor)
+    key = (
+        f'news:{news_id}:comments:{state.comment_count}:'
+        f'{state.last_comment_id}:{state.version}:{cursor or ""}'
+    )
+    page = cache.get(key)
+    if page is None:
+        comments, next_cursor = build_page()
+        page = CommentPage(render_comments(comments), next_cursor)
+        cache.set(key, page, settings.NEWS_FRAGMENT_CACHE_TIMEOUT)
+    return page
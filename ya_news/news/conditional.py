@@ -0,0 +1,96 @@
+"""Валидаторы для условных GET-запросов к страницам новостей.
+
+Функции вызываются декоратором condition до основного запроса
+к базе и до отрисовки шаблона. Страницы отличаются для разных
+пользователей, поэтому пользователь входит в ETag.
+"""
+import hashlib
+from collections import namedtuple
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .caching import get_home_snapshot, get_version
+from .models import Comment, News
+
+NewsState = namedtuple(
+    'NewsState',
+    ('date', 'last_comment', 'comment_count', 'last_comment_id', 'version')
+)
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def version_time(version):
+    """Версия в кеше — момент последнего изменения в наносекундах."""
+    return datetime.fromtimestamp(version / 10 ** 9, tz=dt_timezone.utc)
+
+
+def get_request_home_snapshot(request):
+    """Снимок главной, один на время запроса."""
+    if not hasattr(request, 'home_snapshot'):
+        request.home_snapshot = get_home_snapshot()
+    return request.home_snapshot
+
+
+def home_etag(request, *args, **kwargs):
+    return make_etag(
+        get_request_home_snapshot(request).version, request.user.pk
+    )
+
+
+def home_last_modified(request, *args, **kwargs):
+    return version_time(get_request_home_snapshot(request).version)
+
+
+def get_news_state(request, pk):
+    """Дата новости, сведения о её комментариях и версия новости.
+
+    Число комментариев и наибольший id берутся из базы, поэтому
+    комментарий, добавленный или удалённый в другом процессе, меняет
+    состояние так же, как свой. Считается одним запросом
+    и запоминается на время запроса.
+    """
+    if not hasattr(request, 'news_state'):
+        comments = Comment.objects.filter(news=OuterRef('pk')).order_by()
+        per_news = comments.values('news')
+        state = News.objects.filter(pk=pk).annotate(
+            last_comment=Subquery(
+                comments.order_by('-created').values('created')[:1]
+            ),
+            comment_count=Subquery(
+                per_news.annotate(count=Count('pk')).values('count')
+            ),
+            last_comment_id=Subquery(
+                per_news.annotate(last=Max('pk')).values('last')
+            ),
+        ).values_list(
+            'date', 'last_comment', 'comment_count', 'last_comment_id'
+        ).first()
+        if state is not None:
+            state = NewsState(*state, get_version(pk))
+        request.news_state = state
+    return request.news_state
+
+
+def news_etag(request, pk):
+    state = get_news_state(request, pk)
+    if state is None:
+        return None
+    return make_etag(pk, *state, request.user.pk)
+
+
+def news_last_modified(request, pk):
+    state = get_news_state(request, pk)
+    if state is None:
+        return None
+    moments = [
+        timezone.make_aware(datetime.combine(state.date, time.min)),
+        version_time(state.version),
+    ]
+    if state.last_comment is not None:
+        moments.append(state.last_comment)
+    return max(moments)
@@ -0,0 +1,224 @@
+"""Потоковый импорт новостей из JSON и JSON Lines.
+
+Файл не читается целиком: JSON Lines разбирается построчно, а массив
+JSON — по одному элементу через JSONDecoder.raw_decode() над буфером.
+Элемент — либо запись фикстуры {"model": ..., "fields": {...}},
+либо сами поля новости. Дубликаты по заголовку и дате отбрасываются
+и внутри пачки, и относительно базы, поэтому повторная загрузка пачки
+после сбоя ничего не задвоит.
+"""
+import json
+import os
+from datetime import date
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .models import News
+
+CHUNK_SIZE = 64 * 1024
+# Элемент больше этого размера считаем признаком испорченного файла.
+MAX_ITEM_SIZE = 16 * 1024 * 1024
+# Параметров в одном запросе SQLite по умолчанию не больше 999.
+LOOKUP_CHUNK_SIZE = 900
+MAX_REPORTED_ERRORS = 20
+WHITESPACE = ' \t\r\n'
+TITLE_MAX_LENGTH = News._meta.get_field('title').max_length
+
+
+class ImportStats:
+    """Счётчики импорта; position — сколько элементов файла пройдено."""
+
+    def __init__(self, position=0):
+        self.position = position
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+
+    def add_error(self, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((self.position, message))
+
+
+def detect_format(stream):
+    """Массив JSON начинается с «[», иначе файл считаем JSON Lines."""
+    start = stream.tell()
+    while True:
+        char = stream.read(1)
+        if not char or char not in WHITESPACE:
+            break
+    stream.seek(start)
+    return 'json' if char == '[' else 'jsonl'
+
+
+def iter_json_lines(stream):
+    """Строка, которая не разбирается, отдаётся как None."""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+class JSONArrayReader:
+    """Читает массив JSON верхнего уровня по одному элементу."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def read_more(self):
+        """Дочитывает файл, отбрасывая уже разобранную часть буфера."""
+        more = self.stream.read(self.chunk_size)
+        self.eof = not more
+        self.buffer = self.buffer[self.position:] + more
+        self.position = 0
+
+    def next_char(self):
+        """Первый значимый символ; позиция остаётся на нём."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                raise ValueError('Файл JSON оборвался.')
+            self.read_more()
+
+    def expect(self, chars):
+        char = self.next_char()
+        if char not in chars:
+            raise ValueError(f'Ожидался один из {chars!r}, а не {char!r}.')
+        self.position += 1
+        return char
+
+    def decode(self):
+        self.next_char()
+        while True:
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return item
+            except json.JSONDecodeError:
+                # Элемент не поместился в буфер: дочитываем файл.
+                if (
+                    self.eof
+                    or len(self.buffer) - self.position > MAX_ITEM_SIZE
+                ):
+                    raise
+                self.read_more()
+
+    def __iter__(self):
+        self.expect('[')
+        if self.next_char() == ']':
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',]') == ']':
+                return
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    return iter(JSONArrayReader(stream, chunk_size))
+
+
+def clean_item(item):
+    """Новость из элемента файла; ValueError, если он некорректен."""
+    if isinstance(item, dict) and isinstance(item.get('fields'), dict):
+        item = item['fields']
+    if not isinstance(item, dict):
+        raise ValueError('элемент не является объектом')
+    title = item.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('нет заголовка')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f'заголовок длиннее {TITLE_MAX_LENGTH} символов')
+    text = item.get('text', '')
+    if not isinstance(text, str):
+        raise ValueError('текст не строка')
+    news_date = item.get('date')
+    if news_date is None:
+        news_date = date.today()
+    elif not isinstance(news_date, str) or not parse_date(news_date):
+        raise ValueError(f'некорректная дата {news_date!r}')
+    else:
+        news_date = parse_date(news_date)
+    return News(title=title, text=text, date=news_date)
+
+
+def save_batch(news_list, using):
+    """Сохраняет новости, которых ещё нет в базе; вернёт их число."""
+    unique = {}
+    for news in news_list:
+        unique.setdefault((news.title, news.date), news)
+    titles = list({title for title, _ in unique})
+    queryset = News.objects.using(using)
+    with transaction.atomic(using=using):
+        existing = set()
+        for start in range(0, len(titles), LOOKUP_CHUNK_SIZE):
+            existing.update(queryset.filter(
+                title__in=titles[start:start + LOOKUP_CHUNK_SIZE]
+            ).values_list('title', 'date'))
+        new = [news for key, news in unique.items() if key not in existing]
+        queryset.bulk_create(new)
+    return len(new)
+
+
+def import_news(items, batch_size, using, stats, on_batch=None):
+    """Загружает элементы пачками, каждая пачка — своя транзакция.
+
+    Первые stats.position элементов пропускаются: они уже загружены.
+    После каждой пачки вызывается on_batch(stats).
+    """
+    skip = stats.position
+    batch = []
+    for index, item in enumerate(items):
+        if index < skip:
+            continue
+        stats.position = index + 1
+        try:
+            batch.append(clean_item(item))
+        except ValueError as error:
+            stats.add_error(str(error))
+        if len(batch) == batch_size:
+            flush_batch(batch, using, stats, on_batch)
+            batch = []
+    flush_batch(batch, using, stats, on_batch)
+    return stats
+
+
+def flush_batch(batch, using, stats, on_batch):
+    created = save_batch(batch, using) if batch else 0
+    stats.created += created
+    stats.duplicates += len(batch) - created
+    if on_batch is not None:
+        on_batch(stats)
+
+
+def read_checkpoint(path):
+    """Позиция, до которой файл уже загружен, или 0."""
+    try:
+        with open(path, encoding='utf-8') as checkpoint_file:
+            return json.load(checkpoint_file)['position']
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, position):
+    # Через временный файл, чтобы сбой не оставил половину записи.
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+        json.dump({'position': position}, checkpoint_file)
+    os.replace(temp_path, path)
@@ -0,0 +1,92 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from news.caching import home_changed
+from news.importing import (
+    ImportStats, detect_format, import_news, iter_json_array,
+    iter_json_lines, read_checkpoint, write_checkpoint
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости из файла JSON или JSON Lines пачками. '
+        'После сбоя запустите ещё раз с --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл с новостями')
+        parser.add_argument(
+            '--format', choices=('auto', 'json', 'jsonl'), default='auto',
+            help='по умолчанию определяется по первому символу файла'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='файл с позицией загрузки, по умолчанию <path>.checkpoint'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='продолжить с позиции из файла --checkpoint'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        checkpoint = options['checkpoint'] or f'{options["path"]}.checkpoint'
+        position = read_checkpoint(checkpoint) if options['resume'] else 0
+        stats = ImportStats(position)
+        if position and options['verbosity'] >= 1:
+            self.stdout.write(f'Продолжаем с элемента {position}.')
+        start = time.perf_counter()
+
+        def on_batch(stats):
+            write_checkpoint(checkpoint, stats.position)
+            if options['verbosity'] >= 2:
+                self.stdout.write(
+                    f'Пройдено {stats.position}, создано {stats.created}, '
+                    f'{self.rate(stats, start, position):.0f} элементов/с'
+                )
+
+        try:
+            with open(options['path'], encoding='utf-8') as stream:
+                file_format = options['format']
+                if file_format == 'auto':
+                    file_format = detect_format(stream)
+                items = (
+                    iter_json_array(stream) if file_format == 'json'
+                    else iter_json_lines(stream)
+                )
+                import_news(
+                    items, options['batch_size'], options['database'],
+                    stats, on_batch
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(
+                f'Загрузка остановлена на элементе {stats.position}: {error}'
+            )
+        finally:
+            if stats.created:
+                # bulk_create() не отправляет сигналов, главная устарела.
+                home_changed()
+        os.remove(checkpoint)
+
+        for position, message in stats.errors:
+            self.stderr.write(f'Элемент {position}: {message}')
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {stats.created}, дубликатов {stats.duplicates}, '
+            f'некорректных {stats.invalid}. {stats.position - position} '
+            f'элементов за {elapsed:.1f} с, '
+            f'{self.rate(stats, start, position):.0f} элементов/с, '
+            f'{stats.created / elapsed if elapsed else 0:.0f} строк/с.'
+        ))
+
+    @staticmethod
+    def rate(stats, start, skipped):
+        elapsed = time.perf_counter() - start
+        return (stats.position - skipped) / elapsed if elapsed else 0
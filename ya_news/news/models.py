@@ -2,6 +2,25 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def with_comment_count(self):
+        """Добавляет к каждой новости количество комментариев.
+
+        Считаем коррелированным подзапросом: так база не группирует
+        все комментарии подряд, а считает их только для выбранных новостей.
+        """
+        comments = Comment.objects.filter(
+            news=models.OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        return self.annotate(
+            comment_count=Coalesce(models.Subquery(comments), 0)
+        )
 
 
 class News(models.Model):
@@ -9,8 +28,15 @@ class News(models.Model):
     text = models.TextField()
     date = models.DateField(default=datetime.today)
 
+    objects = NewsQuerySet.as_manager()
+
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_id_idx'),
+            # Поиск дубликатов при импорте ленты.
+            models.Index(fields=('title', 'date'), name='news_title_date_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +58,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,80 @@
+"""Курсорная пагинация ветки комментариев.
+
+Комментарии упорядочены по паре (created, id), поэтому страница
+выбирается условием «после последнего показанного комментария»,
+а не через OFFSET: стоимость страницы зависит только от её размера.
+"""
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.exceptions import BadRequest
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models import Q
+from django.utils import timezone
+
+COMMENTS_ORDERING = ('created', 'pk')
+
+# Допустимые значения id комментария: большее число база не примет.
+COMMENT_ID_RANGE = BaseDatabaseOperations.integer_field_ranges['BigAutoField']
+
+CommentPage = namedtuple('CommentPage', ('comments', 'next_cursor'))
+
+
+def encode_cursor(comment):
+    """Курсор указывает на последний показанный комментарий."""
+    raw = f'{comment.created.isoformat()}|{comment.pk}'
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created, pk = urlsafe_b64decode(
+            cursor.encode()
+        ).decode().split('|')
+        created, pk = datetime.fromisoformat(created), int(pk)
+        if timezone.is_naive(created):
+            created = timezone.make_aware(created)
+        # База хранит время в UTC, а крайние даты при переводе
+        # выходят за пределы datetime: это OverflowError.
+        created = created.astimezone(dt_timezone.utc)
+    except (ValueError, OverflowError, binascii.Error):
+        raise BadRequest('Некорректный курсор комментариев.')
+    low, high = COMMENT_ID_RANGE
+    if not low <= pk <= high:
+        raise BadRequest('Некорректный курсор комментариев.')
+    return created, pk
+
+
+def comments_after(queryset, cursor=None):
+    """Комментарии, идущие строго после курсора."""
+    queryset = queryset.order_by(*COMMENTS_ORDERING)
+    if cursor is None:
+        return queryset
+    created, pk = decode_cursor(cursor)
+    return queryset.filter(
+        Q(created__gt=created) | Q(created=created, pk__gt=pk)
+    )
+
+
+def get_comment_page(queryset, size, cursor=None):
+    """Одна страница комментариев и курсор следующей страницы."""
+    comments = list(comments_after(queryset, cursor)[:size + 1])
+    next_cursor = None
+    if len(comments) > size:
+        comments = comments[:size]
+        next_cursor = encode_cursor(comments[-1])
+    return CommentPage(comments, next_cursor)
+
+
+def iter_comment_chunks(queryset, size):
+    """Комментарии из queryset порциями по size штук."""
+    chunk = []
+    for comment in queryset.iterator(chunk_size=size):
+        chunk.append(comment)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,121 @@
+"""Поиск запрещённых слов в тексте комментариев.
+
+Матчер — любой класс, который принимает список слов и умеет
+найти в тексте первое из них методом search().
+"""
+import os
+import threading
+from collections import deque
+
+
+class SubstringMatcher:
+    """Проверяет каждое слово отдельно: O(len(text) × len(words))."""
+
+    def __init__(self, words):
+        self.words = tuple(word.lower() for word in words if word)
+
+    def search(self, text):
+        lowered_text = text.lower()
+        for word in self.words:
+            if word in lowered_text:
+                return word
+        return None
+
+
+class AhoCorasickMatcher:
+    """Автомат Ахо — Корасик: все слова ищутся за один проход по тексту."""
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.found = [None]
+        for word in words:
+            if word:
+                self._add_word(word.lower())
+        self._build_fail_links()
+
+    def _add_word(self, word):
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.found.append(None)
+            state = next_state
+        self.found[state] = word
+
+    def _build_fail_links(self):
+        """Обходим бор в ширину, чтобы ссылки родителей были готовы."""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                link = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = link
+                if self.found[next_state] is None:
+                    # Слово, оканчивающееся в суффиксе, тоже совпадение.
+                    self.found[next_state] = self.found[link]
+                queue.append(next_state)
+
+    def search(self, text):
+        transitions, fail, found = self.transitions, self.fail, self.found
+        state = 0
+        for char in text.lower():
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if found[state] is not None:
+                return found[state]
+        return None
+
+
+def read_words(path):
+    """Слова из файла: по одному в строке, # — комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        lines = (line.split('#', 1)[0].strip() for line in words_file)
+        return [line for line in lines if line]
+
+
+class BadWordsFilter:
+    """Матчер по встроенному списку слов и, если задан, файлу.
+
+    Автомат собирается один раз; при изменении файла он пересобирается
+    при следующей проверке, без перезапуска процесса.
+    """
+
+    def __init__(self, words, path=None, matcher_class=AhoCorasickMatcher):
+        self.words = tuple(words)
+        self.path = path
+        self.matcher_class = matcher_class
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.reload()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self):
+        """Пересобирает матчер по текущему содержимому файла."""
+        with self._lock:
+            words = list(self.words)
+            mtime = None
+            if self.path:
+                mtime = self._file_mtime()
+                if mtime is not None:
+                    words.extend(read_words(self.path))
+            self.matcher = self.matcher_class(words)
+            self._mtime = mtime
+
+    def search(self, text):
+        if self.path and self._file_mtime() != self._mtime:
+            self.reload()
+        return self.matcher.search(text)
@@ -1,41 +1,87 @@
-from datetime import datetime, timedelta
+import shutil
+from collections import namedtuple
+from datetime import datetime
 
 # Импортируем класс клиента.
 import pytest
 from django.test.client import Client
-from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
 from django.urls import reverse
 from django.utils import timezone
 
 # Импортируем модель заметки, чтобы создать экземпляр.
 from news.forms import BAD_WORDS
 from news.models import News, Comment
+from news.pytest_tests.factories import (
+    fresh, logged_in_client, login_cookie, make_comments, make_news_page
+)
+from yanews.usercache import user_cache
+
+AUTHOR = 'Автор'
+NOT_AUTHOR = 'Не автор'
+USERNAMES = (AUTHOR, NOT_AUTHOR)
+
+SharedUser = namedtuple('SharedUser', ('user', 'cookie'))
+
+
+def is_transactional(request):
+    """Транзакционный тест очищает базу, общих данных в нём нет."""
+    marker = request.node.get_closest_marker('django_db')
+    return marker is not None and marker.kwargs.get('transaction', False)
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Общие пользователи и их сессии создаются один раз.
+
+    Обычный тест откатывается к этому состоянию. Транзакционные тесты
+    pytest-django запускает последними, а фикстуры в них создают
+    пользователей заново.
+    """
+    with django_db_blocker.unblock():
+        users = {}
+        for username in USERNAMES:
+            user = get_user_model().objects.create(username=username)
+            users[username] = SharedUser(user, login_cookie(user))
+    return users
+
+
+def shared_user(request, shared, username):
+    if is_transactional(request):
+        return get_user_model().objects.create(username=username)
+    return fresh(shared[username].user)
+
+
+def user_client(request, shared, user):
+    if is_transactional(request):
+        # Создаём новый экземпляр клиента, чтобы не менять глобальный.
+        client = Client()
+        client.force_login(user)
+        return client
+    return logged_in_client(shared[user.username].cookie)
 
 
 @pytest.fixture
-# Используем встроенную фикстуру для модели пользователей django_user_model.
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+def author(request, django_db_setup):
+    return shared_user(request, django_db_setup, AUTHOR)
 
 
 @pytest.fixture
-def not_author(django_user_model):
-    return django_user_model.objects.create(username='Не автор')
+def not_author(request, django_db_setup):
+    return shared_user(request, django_db_setup, NOT_AUTHOR)
 
 
 @pytest.fixture
-def author_client(author):  # Вызываем фикстуру автора.
-    # Создаём новый экземпляр клиента, чтобы не менять глобальный.
-    client = Client()
-    client.force_login(author)  # Логиним автора в клиенте.
-    return client
+def author_client(request, django_db_setup, author):
+    return user_client(request, django_db_setup, author)
 
 
 @pytest.fixture
-def not_author_client(not_author):
-    client = Client()
-    client.force_login(not_author)  # Логиним обычного пользователя в клиенте.
-    return client
+def not_author_client(request, django_db_setup, not_author):
+    return user_client(request, django_db_setup, not_author)
 
 
 @pytest.fixture
@@ -58,28 +104,12 @@ def comment(news, author):
 
 @pytest.fixture
 def news_page():
-    news_list = []
-    today = datetime.today()
-    for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1):
-        news_ = News.objects.create(
-            title=f'Новость {index}', text='Просто текст.',
-            date=today - timedelta(days=index)
-        )
-        news_list.append(news_)
+    make_news_page(datetime.today())
 
 
 @pytest.fixture
 def comments_for_news(news, author):
-    comment_list = []
-    now = timezone.now()
-    for index in range(10):
-        comment = Comment.objects.create(
-            news=news, author=author, text=f'Tекст {index}',)
-        # Сразу после создания меняем время создания комментария.
-        comment.created = now + timedelta(days=index)
-        # И сохраняем эти изменения.
-        comment.save()
-        comment_list.append(comment)
+    make_comments(news, author, timezone.now())
 
 
 @pytest.fixture(autouse=True)
@@ -87,6 +117,14 @@ def connect_db(db):
     return True
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кеш фрагментов и пользователей не должен переживать откат базы
+    # между тестами.
+    cache.clear()
+    user_cache.clear()
+
+
 @pytest.fixture
 def comment_form_data():
     return {'text': 'Текст комментария'}
@@ -102,6 +140,11 @@ def news_detail_url(news):
     return reverse('news:detail', args=(news.id,))
 
 
+@pytest.fixture
+def news_comments_url(news):
+    return reverse('news:comments', args=(news.id,))
+
+
 @pytest.fixture
 def news_delete_url(comment):
     return reverse('news:delete', args=(comment.id,))
@@ -136,3 +179,42 @@ def users_logout():
 @pytest.fixture
 def users_signup():
     return reverse('users:signup')
+
+
+def add_replica(path):
+    connections.settings['replica'] = {
+        'ENGINE': connections.settings['default']['ENGINE'],
+        'NAME': str(path),
+    }
+
+
+def remove_replica():
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
+
+
+@pytest.fixture(scope='session')
+def replica_template(django_db_setup, django_db_blocker, tmp_path_factory):
+    """Пустая база реплики с миграциями, одна на все тесты."""
+    path = tmp_path_factory.mktemp('replica') / 'replica.sqlite3'
+    add_replica(path)
+    with django_db_blocker.unblock():
+        call_command('migrate', database='replica', verbosity=0)
+    remove_replica()
+    return path
+
+
+@pytest.fixture
+def replica(db, settings, tmp_path, replica_template):
+    """Реплика — отдельный файл SQLite, куда ничего не реплицируется.
+
+    Что прочитано с неё, а что с основной базы, видно по данным.
+    Каждый тест получает свою копию заранее подготовленного файла.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    shutil.copyfile(replica_template, path)
+    add_replica(path)
+    settings.DATABASE_REPLICAS = ['replica']
+    yield 'replica'
+    remove_replica()
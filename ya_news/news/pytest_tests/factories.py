@@ -0,0 +1,59 @@
+"""Наборы данных для фикстур.
+
+Строки создаются bulk_create() с явными датами, а не по одной через
+create() и save(). bulk_create() не отправляет сигналов, но кеш
+всё равно очищается перед каждым тестом.
+"""
+import copy
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, Value, When
+from django.test.client import Client
+
+from news.models import Comment, News
+
+
+def make_news_page(today):
+    """На одну новость больше, чем помещается на главную."""
+    News.objects.bulk_create(
+        News(
+            title=f'Новость {index}', text='Просто текст.',
+            date=today - timedelta(days=index)
+        )
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+    )
+
+
+def make_comments(news, author, now, count=10):
+    """Комментарии с временем создания now, now + 1 день и так далее."""
+    texts = {f'Tекст {index}': now + timedelta(days=index)
+             for index in range(count)}
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=text) for text in texts
+    )
+    # auto_now_add перезаписывает время при вставке, поэтому
+    # нужное время ставится одним UPDATE после неё.
+    Comment.objects.filter(news=news, text__in=texts).update(created=Case(
+        *(When(text=text, then=Value(created))
+          for text, created in texts.items()),
+        output_field=DateTimeField()
+    ))
+
+
+def login_cookie(user):
+    """Cookie сессии пользователя, чтобы не входить в каждом тесте."""
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+def logged_in_client(cookie):
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+    return client
+
+
+def fresh(instance):
+    """Копия общего объекта: изменения в тесте не достанутся другим."""
+    return copy.copy(instance)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from news.admin import LatestCommentFormSet
+from news.models import Comment
+from news.pytest_tests.factories import make_comments
+
+COMMENTS = 100
+
+
+@pytest.fixture
+def many_comments(news, author):
+    make_comments(news, author, timezone.now(), count=COMMENTS)
+
+
+@pytest.fixture
+def news_change_url(news):
+    return reverse('admin:news_news_change', args=(news.pk,))
+
+
+def inline_formset(response):
+    return response.context['inline_admin_formsets'][0].formset
+
+
+def test_change_page_queries_do_not_depend_on_comments(
+        admin_client, many_comments, news_change_url,
+        django_assert_num_queries
+):
+    """Страница новости в админке показывает только последние комментарии.
+
+    Новость со счётчиком, комментарии с авторами и точка сохранения
+    транзакции вокруг них.
+    """
+    admin_client.get(news_change_url)
+    with django_assert_num_queries(4):
+        response = admin_client.get(news_change_url)
+    forms = inline_formset(response).forms
+    assert len(forms) == LatestCommentFormSet.limit
+    assert forms[0].instance.text == f'Tекст {COMMENTS - 1}'
+    assert 'name="comment_set-0-author"' not in response.content.decode()
+    assert f'>{COMMENTS} шт.</a>' in response.content.decode()
+
+
+def test_change_page_saves_shown_comments(admin_client, news, author,
+                                          many_comments, news_change_url):
+    """Новый комментарий не сдвигает формы, открытые до его появления."""
+    response = admin_client.get(news_change_url)
+    form = response.context['adminform'].form
+    formset = inline_formset(response)
+    data = {
+        **{name: form[name].value() for name in form.fields},
+        **{
+            f'comment_set-{name}': value
+            for name, value in formset.management_form.initial.items()
+        },
+    }
+    for index, comment_form in enumerate(formset.forms):
+        data[f'comment_set-{index}-id'] = comment_form.instance.pk
+        data[f'comment_set-{index}-news'] = news.pk
+        data[f'comment_set-{index}-text'] = comment_form.instance.text
+    # Самый старый из показанных комментариев новый вытеснил бы
+    # из последних, и его правка пропала бы.
+    last = len(formset.forms) - 1
+    edited, deleted = formset.forms[last].instance, formset.forms[0].instance
+    data[f'comment_set-{last}-text'] = 'Исправлено модератором'
+    data['comment_set-0-DELETE'] = 'on'
+    newest = Comment.objects.create(news=news, author=author, text='Новый')
+    # make_comments() датирует комментарии днями вперёд.
+    Comment.objects.filter(pk=newest.pk).update(
+        created=timezone.now() + timedelta(days=COMMENTS)
+    )
+    response = admin_client.post(news_change_url, data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get(pk=edited.pk).text == 'Исправлено модератором'
+    assert not Comment.objects.filter(pk=deleted.pk).exists()
+    assert Comment.objects.get(pk=newest.pk).text == 'Новый'
+    assert Comment.objects.count() == COMMENTS
+
+
+def test_news_changelist(admin_client, news, many_comments,
+                         django_assert_max_num_queries):
+    url = reverse('admin:news_news_changelist')
+    with django_assert_max_num_queries(5):
+        response = admin_client.get(url, {'date__year': news.date.year})
+    assert response.status_code == HTTPStatus.OK
+    news_on_page, = response.context['cl'].result_list
+    assert news_on_page.comment_count == COMMENTS
+
+
+def test_comment_changelist_for_news(admin_client, news, many_comments,
+                                     django_assert_num_queries):
+    """Ветка новости в разделе комментариев — по страницам, без N+1."""
+    url = reverse('admin:news_comment_changelist')
+    admin_client.get(url, {'news__id__exact': news.pk})
+    # Число строк новости и страница с новостями и авторами.
+    with django_assert_num_queries(2):
+        response = admin_client.get(url, {'news__id__exact': news.pk})
+    changelist = response.context['cl']
+    assert changelist.result_count == COMMENTS
+    assert len(changelist.result_list) == changelist.list_per_page
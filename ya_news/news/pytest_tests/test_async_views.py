@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncClient, RequestFactory
+
+from news.async_views import news_detail, news_list
+from news.models import Comment
+from yanews.middleware import QueryStats, current_stats
+
+# Пул потоков базы открывает свои соединения и не видит
+# незафиксированных данных, поэтому тесты транзакционные.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def call(view, request, *args, **kwargs):
+    request.query_stats = QueryStats()
+    token = current_stats.set(request.query_stats)
+    try:
+        response = async_to_sync(view)(request, *args, **kwargs)
+    finally:
+        current_stats.reset(token)
+    return response
+
+
+def test_async_home(news, news_home_url):
+    """Главная отдаётся асинхронно, запросы к базе идут в пуле."""
+    request = RequestFactory().get(news_home_url)
+    request.user = AnonymousUser()
+    response = call(news_list, request)
+    assert response.status_code == HTTPStatus.OK
+    assert news.title in response.content.decode()
+    assert request.query_stats.count == 1
+
+
+def test_async_detail(news, comment, news_detail_url):
+    request = RequestFactory().get(news_detail_url)
+    request.user = AnonymousUser()
+    response = call(news_detail, request, pk=news.pk)
+    assert response.status_code == HTTPStatus.OK
+    assert comment.text in response.content.decode()
+
+
+def test_async_detail_post(author, news, news_detail_url,
+                           comment_form_data):
+    """Асинхронный диспетчер отдаёт POST форме комментария."""
+    request = RequestFactory().post(news_detail_url, comment_form_data)
+    request.user = author
+    response = call(news_detail, request, pk=news.pk)
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get().text == comment_form_data['text']
+
+
+def test_async_detail_method_not_allowed(news, news_detail_url):
+    request = RequestFactory().delete(news_detail_url)
+    request.user = AnonymousUser()
+    response = call(news_detail, request, pk=news.pk)
+    assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+
+def test_query_budget_under_asgi(news, news_home_url):
+    """Под ASGI запросы синхронного представления тоже учтены."""
+    async def get():
+        return await AsyncClient().get(news_home_url)
+
+    response = async_to_sync(get)()
+    assert response.status_code == HTTPStatus.OK
+    assert 'desc="1 queries"' in response['Server-Timing']
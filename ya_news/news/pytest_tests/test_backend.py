@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+from django.db import connection, transaction
+
+
+def test_connection_pragmas():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone() == (1,)  # NORMAL
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone() == (5000,)
+
+
+def locked_once():
+    calls = []
+
+    def execute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return len(calls)
+
+    return execute
+
+
+def test_locked_query_is_retried_outside_transaction(monkeypatch):
+    connection.ensure_connection()
+    monkeypatch.setattr(connection, 'autocommit', True)
+    assert connection.retry_locked(locked_once()) == 2
+
+
+def test_locked_query_is_not_retried_in_transaction():
+    with transaction.atomic():
+        with pytest.raises(sqlite3.OperationalError):
+            connection.retry_locked(locked_once())
@@ -1,6 +1,15 @@
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 from news.forms import CommentForm
+from news.models import Comment
+from news.views import NewsComment, NewsDetail
 
 
 def test_news_count(client, news_page, news_home_url):
@@ -31,6 +40,46 @@ def test_news_order(client, news_page, news_home_url):
     assert all_dates == sorted_dates
 
 
+def test_news_comment_count(client, news, comments_for_news,
+                            news_home_url):
+    """На главной выводится количество комментариев к новости."""
+    response = client.get(news_home_url)
+    news_on_page, = response.context['object_list']
+    assert news_on_page.comment_count == news.comment_set.count()
+    assert f'Комментариев: {news_on_page.comment_count}' in (
+        response.content.decode()
+    )
+
+
+def test_home_queries_do_not_depend_on_comments(client, news,
+                                                news_home_url,
+                                                django_assert_num_queries):
+    """Главная страница не загружает комментарии новостей.
+
+    Сборка снимка главной стоит одного запроса и для новости
+    без комментариев, и для новости с комментариями.
+    """
+    with django_assert_num_queries(1):
+        client.get(news_home_url)
+    author = get_user_model().objects.create(username='Комментатор')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(50)
+    )
+    cache.clear()
+    with django_assert_num_queries(1):
+        client.get(news_home_url)
+
+
+def test_home_served_from_snapshot(client, news, news_home_url,
+                                   django_assert_num_queries):
+    """Готовый снимок главной отдаётся без запросов к базе."""
+    client.get(news_home_url)
+    with django_assert_num_queries(0):
+        response = client.get(news_home_url)
+    assert news.title in response.content.decode()
+
+
 def test_comments_order(client, news, comments_for_news, news_detail_url):
     """Комментарии на странице отдельной новости.
 
@@ -53,6 +102,139 @@ def test_comments_order(client, news, comments_for_news, news_detail_url):
     assert all_timestamps == sorted_timestamps
 
 
+def test_comments_first_page(client, news, comments_for_news,
+                             news_detail_url, settings):
+    """На странице новости выводится только первая страница комментариев."""
+    settings.COMMENTS_PAGE_SIZE = 3
+    response = client.get(news_detail_url)
+    comments = [comment.pk for comment in response.context['comments']]
+    assert comments == [comment.pk for comment in news.comment_set.all()[:3]]
+    assert response.context['next_cursor'] is not None
+
+
+def test_comments_load_more(client, news, comments_for_news,
+                            news_detail_url, news_comments_url, settings):
+    """Фрагмент «Показать ещё» продолжает ветку с места курсора."""
+    settings.COMMENTS_PAGE_SIZE = 4
+    response = client.get(news_detail_url)
+    shown = list(response.context['comments'])
+    cursor = response.context['next_cursor']
+    while cursor is not None:
+        response = client.get(news_comments_url, {'after': cursor})
+        shown.extend(response.context['comments'])
+        cursor = response.context['next_cursor']
+    assert [comment.pk for comment in shown] == [
+        comment.pk for comment in news.comment_set.all()
+    ]
+
+
+def test_comments_stream(client, news, comments_for_news,
+                         news_comments_url, settings):
+    """Потоковый режим отдаёт все комментарии порциями."""
+    settings.COMMENTS_PAGE_SIZE = 3
+    response = client.get(news_comments_url, {'stream': 1})
+    assert response.streaming
+    content = b''.join(response.streaming_content).decode()
+    for comment in news.comment_set.all():
+        assert comment.text in content
+    assert 'load-more' not in content
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'не курсор',
+        urlsafe_b64encode(
+            b'2020-01-01T00:00:00|99999999999999999999999'
+        ).decode(),
+        urlsafe_b64encode(
+            b'2020-01-01T00:00:00|-99999999999999999999999'
+        ).decode(),
+        urlsafe_b64encode(b'9999-12-31T23:59:59-14:00|1').decode(),
+        urlsafe_b64encode(b'0001-01-01T00:00:00+14:00|1').decode(),
+    )
+)
+def test_comments_invalid_cursor(client, news, news_comments_url, cursor):
+    """Некорректный курсор — ошибка запроса, а не ошибка сервера."""
+    response = client.get(news_comments_url, {'after': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_detail_queries_do_not_depend_on_comments(
+        client, news, comments_for_news, news_detail_url, settings,
+        django_assert_num_queries
+):
+    """Страница новости читает из базы не больше одной страницы."""
+    settings.COMMENTS_PAGE_SIZE = 2
+    # Валидаторы условного запроса, новость и страница комментариев.
+    with django_assert_num_queries(3):
+        response = client.get(news_detail_url)
+    assert len(response.context['comments']) == 2
+
+
+def test_detail_comments_cached(client, news, comments_for_news,
+                                news_detail_url,
+                                django_assert_num_queries):
+    """Повторный показ ветки комментариев не обращается к базе за ней."""
+    client.get(news_detail_url)
+    with django_assert_num_queries(2):
+        client.get(news_detail_url)
+
+
+def test_comment_change_invalidates_thread(client, author, news, comment,
+                                           news_detail_url):
+    """Новый и отредактированный комментарий сразу видны на странице."""
+    client.get(news_detail_url)
+    Comment.objects.create(news=news, author=author, text='Новый')
+    comment.text = 'Исправленный'
+    comment.save()
+    content = client.get(news_detail_url).content.decode()
+    assert 'Новый' in content
+    assert 'Исправленный' in content
+
+
+def test_thread_follows_database_without_signals(client, author, news,
+                                                 comment, news_detail_url,
+                                                 news_comments_url):
+    """Комментарии, записанные в обход сигналов этого процесса, видны.
+
+    Так выглядит запись через другой процесс со своим кешем.
+    """
+    client.get(news_detail_url)
+    client.get(news_comments_url)
+    Comment.objects.bulk_create(
+        [Comment(news=news, author=author, text='Из другого процесса')]
+    )
+    assert 'Из другого процесса' in client.get(
+        news_detail_url
+    ).content.decode()
+    assert 'Из другого процесса' in client.get(
+        news_comments_url
+    ).content.decode()
+    with mock.patch('news.signals.bump_version'):
+        comment.delete()
+    assert comment.text not in client.get(news_detail_url).content.decode()
+
+
+def test_news_change_invalidates_home_card(client, news, news_home_url,
+                                           settings):
+    """Изменение новости обновляет её карточку на главной."""
+    settings.HOME_SNAPSHOT_DEBOUNCE = 0
+    client.get(news_home_url)
+    news.title = 'Новый заголовок'
+    news.save()
+    assert 'Новый заголовок' in client.get(news_home_url).content.decode()
+
+
+def test_cached_thread_has_user_links(client, author_client, comment,
+                                      news_detail_url, news_edit_url):
+    """Ссылки автора комментария не попадают в общий кеш."""
+    assert news_edit_url not in client.get(news_detail_url).content.decode()
+    response = author_client.get(news_detail_url)
+    assert news_edit_url in response.content.decode()
+    assert news_edit_url not in client.get(news_detail_url).content.decode()
+
+
 def test_anonymous_client_has_no_form(client, news, news_detail_url):
     """Анонимному пользователю недоступна форма.
 
@@ -70,3 +252,20 @@ def test_authorized_client_has_form(author_client, news, news_detail_url):
     assert 'form' in response.context
     # Проверим, что объект формы соответствует нужному классу формы.
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_detail_views_built_once(client, author_client, news,
+                                 news_detail_url, comment_form_data):
+    """Представления страницы новости не собираются на каждый запрос.
+
+    Анонимный просмотр к тому же обходится без формы комментария.
+    """
+    with mock.patch.object(NewsDetail, 'as_view') as detail_as_view, \
+            mock.patch.object(NewsComment, 'as_view') as comment_as_view:
+        with mock.patch('news.views.CommentForm') as form_class:
+            assert client.get(news_detail_url).status_code == HTTPStatus.OK
+        form_class.assert_not_called()
+        response = author_client.post(news_detail_url, data=comment_form_data)
+        assert response.status_code == HTTPStatus.FOUND
+    detail_as_view.assert_not_called()
+    comment_as_view.assert_not_called()
@@ -0,0 +1,92 @@
+import io
+import json
+from datetime import date
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from news import importing
+from news.caching import get_home_snapshot
+from news.models import News
+
+FIXTURE = 'news/fixtures/news.json'
+
+
+def write_jsonl(path, items):
+    path.write_text(
+        '\n'.join(json.dumps(item, ensure_ascii=False) for item in items),
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+def test_import_fixture_file():
+    """Файл фикстуры загружается как массив JSON."""
+    with open(FIXTURE, encoding='utf-8') as fixture:
+        expected = len(json.load(fixture))
+    call_command('import_news', FIXTURE, stdout=io.StringIO())
+    assert News.objects.count() == expected
+
+
+def test_import_jsonl_deduplicates(tmp_path):
+    News.objects.create(title='Было', text='Текст', date=date(2022, 1, 1))
+    path = write_jsonl(tmp_path / 'feed.jsonl', [
+        {'title': 'Было', 'text': 'Снова', 'date': '2022-01-01'},
+        {'title': 'Новое', 'text': 'Текст', 'date': '2022-01-02'},
+        {'title': 'Новое', 'text': 'Повтор', 'date': '2022-01-02'},
+        {'title': 'Новое', 'text': 'Другой день', 'date': '2022-01-03'},
+    ])
+    call_command('import_news', path, batch_size=2, stdout=io.StringIO())
+    assert News.objects.count() == 3
+    assert News.objects.get(date=date(2022, 1, 2)).text == 'Текст'
+
+
+def test_import_skips_invalid_items(tmp_path):
+    path = write_jsonl(tmp_path / 'feed.jsonl', [
+        {'title': '', 'text': 'Без заголовка'},
+        {'title': 'Дата', 'date': '2022-13-01'},
+        {'title': 'З' * 51},
+        {'title': 'Хорошая', 'text': 'Текст'},
+    ])
+    stderr = io.StringIO()
+    call_command('import_news', path, stdout=io.StringIO(), stderr=stderr)
+    assert list(News.objects.values_list('title', flat=True)) == ['Хорошая']
+    assert stderr.getvalue().count('Элемент') == 3
+
+
+def test_import_rebuilds_home_snapshot(tmp_path, settings):
+    settings.HOME_SNAPSHOT_DEBOUNCE = 0
+    assert not get_home_snapshot().news_list
+    path = write_jsonl(tmp_path / 'feed.jsonl', [{'title': 'Новость'}])
+    call_command('import_news', path, stdout=io.StringIO())
+    news, = get_home_snapshot().news_list
+    assert news.title == 'Новость'
+
+
+def test_import_resumes_from_checkpoint(tmp_path):
+    items = [{'title': f'Новость {index}'} for index in range(5)]
+    items.insert(3, 'не объект')
+    path = tmp_path / 'feed.json'
+    # Массив обрывается посреди шестого элемента.
+    path.write_text(
+        json.dumps(items[:5], ensure_ascii=False)[:-1] + ', {"tit',
+        encoding='utf-8'
+    )
+    with pytest.raises(CommandError):
+        call_command('import_news', str(path), batch_size=2,
+                     stdout=io.StringIO())
+    assert News.objects.count() == 4
+    assert importing.read_checkpoint(f'{path}.checkpoint') == 5
+
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding='utf-8')
+    call_command('import_news', str(path), batch_size=2, resume=True,
+                 stdout=io.StringIO(), stderr=io.StringIO())
+    assert News.objects.count() == 5
+    assert not (tmp_path / 'feed.json.checkpoint').exists()
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 4096))
+def test_iter_json_array_chunks(chunk_size):
+    items = [{'title': 'а, ] [', 'n': index} for index in range(10)]
+    stream = io.StringIO(' \n' + json.dumps(items, ensure_ascii=False))
+    assert list(importing.iter_json_array(stream, chunk_size)) == items
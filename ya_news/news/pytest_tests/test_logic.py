@@ -1,9 +1,14 @@
+import os
 from http import HTTPStatus
 
+import pytest
 from pytest_django.asserts import assertRedirects, assertFormError
 
-from news.forms import WARNING
+from news.forms import BAD_WORDS, WARNING
 from news.models import Comment
+from news.profanity import (
+    AhoCorasickMatcher, BadWordsFilter, SubstringMatcher
+)
 
 
 def test_anonymous_user_cant_create_comment(client, news, comment_form_data,
@@ -59,6 +64,38 @@ def test_user_cant_use_bad_words(news, author_client,
     assert Comment.objects.count() == excepted_comment_count
 
 
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Обычный текст без ругательств.',
+        f'Текст с {BAD_WORDS[0].upper()} посередине',
+        f'{BAD_WORDS[-1]} в начале',
+        'в конце ' + BAD_WORDS[0],
+        'почти редиск, но нет',
+    )
+)
+def test_matchers_agree(text):
+    """Автомат находит запрещённые слова там же, где и простой перебор."""
+    words = BAD_WORDS + ('дис', 'иска', 'ка')
+    expected = SubstringMatcher(words).search(text) is not None
+    assert (AhoCorasickMatcher(words).search(text) is not None) == expected
+
+
+def test_bad_words_file_reloads(tmp_path):
+    """Изменения файла со словами применяются без перезапуска."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# стоп-слова\nбяка\n', encoding='utf-8')
+    bad_words = BadWordsFilter(BAD_WORDS, words_file)
+    assert bad_words.search('Вот бяка!') == 'бяка'
+    assert bad_words.search('Вот бука!') is None
+    words_file.write_text('бука\n', encoding='utf-8')
+    stat = words_file.stat()
+    os.utime(words_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert bad_words.search('Вот бука!') == 'бука'
+    assert bad_words.search('Вот бяка!') is None
+    assert bad_words.search(BAD_WORDS[0]) == BAD_WORDS[0]
+
+
 def test_author_can_delete_comment(news, author, comment, author_client,
                                    news_delete_url,
                                    news_detail_url):
@@ -119,3 +156,32 @@ def test_user_cant_edit_comment_of_another_user(author, comment,
     assert edit_comment.author == comment.author
     assert edit_comment.news == comment.news
     assert edit_comment.created == comment.created
+
+
+@pytest.mark.parametrize(
+    'method, url, data, expected_queries',
+    (
+        # Новость, вставка комментария.
+        ('post', pytest.lazy_fixture('news_detail_url'),
+         pytest.lazy_fixture('comment_form_data'), 2),
+        # Комментарий вместе с новостью.
+        ('get', pytest.lazy_fixture('news_edit_url'), None, 1),
+        ('get', pytest.lazy_fixture('news_delete_url'), None, 1),
+        # Комментарий, изменение.
+        ('post', pytest.lazy_fixture('news_edit_url'),
+         pytest.lazy_fixture('comment_form_data'), 2),
+        ('post', pytest.lazy_fixture('news_delete_url'), None, 2),
+    )
+)
+def test_comment_write_query_budget(author_client, news_home_url, method,
+                                    url, data, expected_queries,
+                                    django_assert_num_queries):
+    """Запись комментария не загружает одни и те же объекты повторно.
+
+    Сессия читается из cookie, пользователь — из кеша процесса,
+    куда его положил предыдущий запрос.
+    """
+    author_client.get(news_home_url)
+    with django_assert_num_queries(expected_queries):
+        response = getattr(author_client, method)(url, data)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
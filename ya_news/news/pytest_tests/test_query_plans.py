@@ -0,0 +1,77 @@
+import re
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+
+from news import views
+from news.pagination import comments_after, encode_cursor
+
+FULL_SCAN = re.compile(r'^SCAN \S+$')
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='План запроса проверяется только для SQLite.'
+)
+
+
+def explain(queryset):
+    """Строки EXPLAIN QUERY PLAN для запроса queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def make_view(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+def home_queryset(author, comment):
+    return make_view(views.NewsList, author).get_queryset()
+
+
+def detail_queryset(author, comment):
+    view = make_view(views.NewsDetail, author, pk=comment.news_id)
+    return view.model.objects.filter(pk=comment.news_id)
+
+
+def comments_page_queryset(author, comment):
+    view = make_view(views.NewsComments, author, pk=comment.news_id)
+    return comments_after(
+        view.get_comments(), encode_cursor(comment)
+    )[:settings.COMMENTS_PAGE_SIZE + 1]
+
+
+def comment_edit_queryset(author, comment):
+    view = make_view(views.CommentUpdate, author, pk=comment.pk)
+    # Как и get_object(): QuerySet.get() сбрасывает сортировку.
+    return view.get_queryset().filter(pk=comment.pk).order_by()
+
+
+def comment_delete_queryset(author, comment):
+    view = make_view(views.CommentDelete, author, pk=comment.pk)
+    return view.get_queryset().filter(pk=comment.pk).order_by()
+
+
+@pytest.mark.parametrize(
+    'build_queryset',
+    (
+        home_queryset,
+        detail_queryset,
+        comments_page_queryset,
+        comment_edit_queryset,
+        comment_delete_queryset,
+    )
+)
+def test_view_queryset_uses_indexes(author, comment, build_queryset):
+    """Запросы страниц не читают таблицы целиком и не сортируют в памяти."""
+    plan = explain(build_queryset(author, comment))
+    for step in plan:
+        assert not FULL_SCAN.match(step), plan
+        assert 'TEMP B-TREE' not in step, plan
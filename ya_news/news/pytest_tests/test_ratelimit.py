@@ -0,0 +1,140 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache.backends.locmem import LocMemCache
+
+from news.models import Comment
+from yanews.ratelimit import TokenBucketLimiter
+
+THREADS = 8
+ATTEMPTS = 50
+
+
+class FrozenClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingCache:
+    """Считает обращения к кешу."""
+
+    def __init__(self):
+        self.cache = LocMemCache('ratelimit-tests', {})
+        self.cache.clear()
+        self.calls = itertools.count()
+
+    def __getattr__(self, name):
+        next(self.calls)
+        return getattr(self.cache, name)
+
+
+@pytest.fixture
+def clock():
+    return FrozenClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return TokenBucketLimiter(CountingCache(), clock)
+
+
+def test_bucket_refills_up_to_burst(limiter, clock):
+    granted = [limiter.acquire('key', 1, 3) == 0 for _ in range(4)]
+    assert granted == [True, True, True, False]
+    assert limiter.acquire('key', 1, 3) == pytest.approx(1)
+    clock.now += 1
+    assert limiter.acquire('key', 1, 3) == 0
+    assert limiter.acquire('key', 1, 3) > 0
+    # За долгий простой копится не больше burst токенов.
+    clock.now += 3600
+    granted = [limiter.acquire('key', 1, 3) == 0 for _ in range(4)]
+    assert granted == [True, True, True, False]
+
+
+def test_concurrent_clients_are_served_fairly(limiter):
+    """Клиент, забравший свои токены, не мешает остальным."""
+    def run(client):
+        return sum(
+            limiter.acquire(client, 0.001, 10) == 0
+            for _ in range(ATTEMPTS)
+        )
+
+    clients = ['bot'] * THREADS + [f'user-{index}' for index in range(8)]
+    with ThreadPoolExecutor(THREADS * 2) as executor:
+        granted = list(executor.map(run, clients))
+    assert granted[THREADS:] == [10] * 8
+    # Одновременные запросы к полной корзине могут пройти все,
+    # но не больше одного лишнего на поток.
+    assert 10 <= sum(granted[:THREADS]) <= 10 + THREADS
+
+
+def test_throttled_client_does_not_reach_cache(limiter):
+    """После отказа клиент получает отказы без обращений к кешу."""
+    for _ in range(11):
+        limiter.acquire('bot', 0.001, 10)
+    calls = next(limiter.cache.calls)
+    for _ in range(10000):
+        assert limiter.acquire('bot', 0.001, 10) > 0
+    assert next(limiter.cache.calls) == calls + 1
+
+
+def test_throttled_comment_gets_429(author_client, not_author_client,
+                                    news_detail_url, comment_form_data,
+                                    settings, django_assert_num_queries):
+    """Лишний комментарий отклоняется до обращения к базе."""
+    settings.RATE_LIMITS = {'news:detail': (0.001, 2)}
+    for _ in range(2):
+        author_client.post(news_detail_url, data=comment_form_data)
+    with django_assert_num_queries(0):
+        response = author_client.post(
+            news_detail_url, data=comment_form_data
+        )
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
+    assert Comment.objects.count() == 2
+    # Чтение не ограничивается, у другого пользователя своя корзина.
+    assert author_client.get(news_detail_url).status_code == HTTPStatus.OK
+    response = not_author_client.post(news_detail_url, data=comment_form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def login_again(client, user, number):
+    """Вход с новой cookie сессии, как после выхода и повторного входа."""
+    client.force_login(user)
+    session = client.session
+    session['login'] = number
+    session.save()
+    client.cookies[django_settings.SESSION_COOKIE_NAME] = session.session_key
+
+
+def test_limit_survives_relogin(client, author, news_detail_url,
+                                comment_form_data, settings):
+    """Новая сессия того же пользователя не даёт новой корзины."""
+    settings.RATE_LIMITS = {'news:detail': (0.001, 2)}
+    for number in range(3):
+        login_again(client, author, number)
+        response = client.post(news_detail_url, data=comment_form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_address_has_own_bucket(author_client, not_author_client,
+                                news_detail_url, comment_form_data,
+                                settings):
+    """Запись с одного адреса ограничена и для разных пользователей."""
+    settings.RATE_LIMITS = {'news:detail': (0.001, 2)}
+    settings.RATE_LIMIT_IP_FACTOR = 1
+    for _ in range(2):
+        author_client.post(news_detail_url, data=comment_form_data)
+    response = not_author_client.post(news_detail_url, data=comment_form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    response = not_author_client.post(
+        news_detail_url, data=comment_form_data, REMOTE_ADDR='10.0.0.2'
+    )
+    assert response.status_code == HTTPStatus.FOUND
@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+
+from news.models import Comment, News
+from yanews.middleware import PIN_COOKIE
+from yanews.routers import ReplicaRouter, use_primary
+
+# В транзакции теста маршрутизатор читал бы только из основной базы.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def test_reads_go_to_replica(client, replica, news, news_detail_url,
+                             news_home_url):
+    # Свой pk, чтобы не совпасть с новостью основной базы.
+    News.objects.using(replica).create(
+        pk=news.pk + 1, title='С реплики', text='Текст'
+    )
+    assert 'С реплики' in client.get(news_home_url).content.decode()
+    # Новость есть только в основной базе.
+    response = client.get(news_detail_url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_reads_after_write_stick_to_primary(author_client, replica, news,
+                                            news_detail_url,
+                                            comment_form_data):
+    response = author_client.post(news_detail_url, data=comment_form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert PIN_COOKIE in response.cookies
+    response = author_client.get(response.url)
+    assert response.status_code == HTTPStatus.OK
+    assert comment_form_data['text'] in response.content.decode()
+    assert Comment.objects.using('default').count() == 1
+
+
+def test_pin_expires(author_client, replica, settings, news,
+                     news_detail_url, comment_form_data):
+    settings.REPLICA_PIN_SECONDS = 0
+    response = author_client.post(news_detail_url, data=comment_form_data)
+    assert PIN_COOKIE not in response.cookies
+    response = author_client.get(news_detail_url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_router_without_replicas(settings):
+    settings.DATABASE_REPLICAS = []
+    assert ReplicaRouter().db_for_read(News) == 'default'
+
+
+def test_router_pins_primary(replica):
+    router = ReplicaRouter()
+    assert router.db_for_read(News) == replica
+    assert router.db_for_write(News) == 'default'
+    with use_primary():
+        assert router.db_for_read(News) == 'default'
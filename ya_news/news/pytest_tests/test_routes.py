@@ -1,10 +1,16 @@
+import json
+import os
 from http import HTTPStatus
 
 import pytest
 from pytest_django.asserts import assertRedirects
 
+from news.models import Comment
+from yanews.middleware import QueryStats
+
 NEWS_DELETE_URL = pytest.lazy_fixture('news_edit_url')
 NEWS_DETAIL_URL = pytest.lazy_fixture('news_detail_url')
+NEWS_COMMENTS_URL = pytest.lazy_fixture('news_comments_url')
 NEWS_EDIT_URL = pytest.lazy_fixture('news_edit_url')
 NEWS_HOME_URL = pytest.lazy_fixture('news_home_url')
 USERS_LOGIN_URL = pytest.lazy_fixture('users_logout')
@@ -21,6 +27,7 @@ USERS_SIGNUP_URL = pytest.lazy_fixture('users_signup')
         USERS_LOGOUT_URL,
         USERS_SIGNUP_URL,
         NEWS_DETAIL_URL,
+        NEWS_COMMENTS_URL,
     )
 )
 # Указываем в фикстурах встроенный клиент.
@@ -70,3 +77,75 @@ def test_redirect_for_anonymous_client(client, url, users_login):
     # Ожидаем, что со всех проверяемых страниц анонимный клиент
     # будет перенаправлен на страницу логина:
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.parametrize('url', (NEWS_HOME_URL, NEWS_DETAIL_URL))
+def test_conditional_get_not_modified(client, news, comment, url):
+    """Повторный запрос с валидаторами не отрисовывает шаблоны."""
+    response = client.get(url)
+    assert response.has_header('ETag')
+    assert response.has_header('Last-Modified')
+    last_modified = response['Last-Modified']
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.templates == []
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.templates == []
+
+
+@pytest.mark.parametrize('url', (NEWS_HOME_URL, NEWS_DETAIL_URL))
+def test_conditional_get_after_change(client, news, author, url,
+                                      settings):
+    """После нового комментария страница отдаётся заново."""
+    settings.HOME_SNAPSHOT_DEBOUNCE = 0
+    etag = client.get(url)['ETag']
+    Comment.objects.create(news=news, author=author, text='Новый')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_conditional_get_depends_on_user(client, author_client, news,
+                                         news_detail_url):
+    """Страница другого пользователя не считается той же версией."""
+    etag = client.get(news_detail_url)['ETag']
+    response = author_client.get(news_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_query_budget_header(client, news, news_home_url):
+    """Ответ сообщает, сколько запросов к базе он стоил."""
+    response = client.get(news_home_url)
+    server_timing = response['Server-Timing']
+    assert 'db;dur=' in server_timing
+    assert 'desc="1 queries"' in server_timing
+    assert 'tpl;dur=' in server_timing
+
+
+def test_query_budget_report(client, news, news_home_url, news_detail_url,
+                             settings, tmp_path):
+    """Сводка по именам URL сбрасывается в JSON-файл процесса.
+
+    Второй раз главная отдаётся из снимка без запросов.
+    """
+    settings.QUERY_BUDGET_REPORT_PATH = str(tmp_path / 'query_budget.json')
+    report_path = tmp_path / f'query_budget.{os.getpid()}.json'
+    settings.QUERY_BUDGET_FLUSH_INTERVAL = 0
+    client.get(news_home_url)
+    client.get(news_home_url)
+    client.get(news_detail_url)
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    assert report['news:home']['requests'] == 2
+    assert report['news:home']['queries'] == 1
+    assert report['news:detail']['requests'] == 1
+    assert not (tmp_path / 'query_budget.json').exists()
+
+
+def test_query_budget_duplicates():
+    """Одинаковые запросы с разными параметрами — признак N+1."""
+    stats = QueryStats()
+    for pk in range(3):
+        stats(lambda *args: None, 'SELECT %s', (pk,), False, {})
+    stats(lambda *args: None, 'SELECT 1', (), False, {})
+    assert stats.count == 4
+    assert stats.duplicates(threshold=3) == {'SELECT %s': 3}
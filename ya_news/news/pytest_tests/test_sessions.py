@@ -0,0 +1,48 @@
+from django.urls import reverse
+
+from yanews.usercache import user_cache
+
+
+def user_key(user):
+    return user._meta.pk.value_to_string(user)
+
+
+def test_authenticated_home_without_queries(author_client, news,
+                                            news_home_url,
+                                            django_assert_num_queries):
+    """Сессия не читается из базы, пользователь — только первый раз."""
+    author_client.get(news_home_url)
+    user_cache.clear()
+    # Главная уже в снимке, остаётся только строка пользователя.
+    with django_assert_num_queries(1):
+        author_client.get(news_home_url)
+    with django_assert_num_queries(0):
+        response = author_client.get(news_home_url)
+    assert response.context['user'].username == 'Автор'
+
+
+def test_user_cache_disabled(author_client, news_home_url, settings,
+                             django_assert_num_queries):
+    settings.AUTH_USER_CACHE_TTL = 0
+    author_client.get(news_home_url)
+    with django_assert_num_queries(1):
+        author_client.get(news_home_url)
+
+
+def test_password_change_ends_cached_sessions(author, author_client,
+                                              news_home_url):
+    author_client.get(news_home_url)
+    assert user_key(author) in user_cache.users
+    author.set_password('Новый пароль')
+    author.save()
+    assert user_key(author) not in user_cache.users
+    response = author_client.get(news_home_url)
+    assert not response.context['user'].is_authenticated
+
+
+def test_logout_drops_cached_user(author, author_client, news_home_url):
+    author_client.get(news_home_url)
+    author_client.get(reverse('users:logout'))
+    assert user_key(author) not in user_cache.users
+    response = author_client.get(news_home_url)
+    assert not response.context['user'].is_authenticated
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from news.caching import HOME_SNAPSHOT_KEY, get_home_snapshot
+from news.models import Comment, News
+
+
+def snapshot_rows():
+    return [
+        (news.pk, news.title, news.comment_count)
+        for news in get_home_snapshot().news_list
+    ]
+
+
+def database_rows():
+    return [
+        (news.pk, news.title, news.comment_count)
+        for news in News.objects.with_comment_count()[:10]
+    ]
+
+
+@pytest.fixture
+def no_debounce(settings):
+    settings.HOME_SNAPSHOT_DEBOUNCE = 0
+
+
+@pytest.mark.usefixtures('no_debounce')
+def test_snapshot_follows_writes(news_page, news, author):
+    """После каждой записи снимок совпадает со свежим запросом."""
+    get_home_snapshot()
+    Comment.objects.create(news=news, author=author, text='Первый')
+    assert snapshot_rows() == database_rows()
+    latest = News.objects.create(title='Свежая', text='Текст')
+    assert snapshot_rows() == database_rows()
+    latest.delete()
+    assert snapshot_rows() == database_rows()
+    Comment.objects.filter(news=news).delete()
+    assert snapshot_rows() == database_rows()
+
+
+@pytest.mark.usefixtures('no_debounce')
+def test_comment_outside_home_keeps_snapshot(news_page, author):
+    """Комментарий к новости, которой нет на главной, не пересобирает её."""
+    version = get_home_snapshot().version
+    oldest = News.objects.order_by('date').first()
+    Comment.objects.create(news=oldest, author=author, text='Текст')
+    assert get_home_snapshot().version == version
+
+
+def make_snapshot_old(seconds):
+    snapshot = cache.get(HOME_SNAPSHOT_KEY)
+    cache.set(
+        HOME_SNAPSHOT_KEY, snapshot._replace(built=time.time() - seconds),
+        None
+    )
+
+
+def test_burst_is_debounced(news, author, settings):
+    """Поток комментариев не пересобирает снимок на каждую запись."""
+    settings.HOME_SNAPSHOT_DEBOUNCE = 60
+    settings.HOME_SNAPSHOT_MAX_STALENESS = 5
+    version = get_home_snapshot().version
+    for index in range(5):
+        Comment.objects.create(news=news, author=author, text=f'{index}')
+    snapshot = get_home_snapshot()
+    assert snapshot.version == version
+    assert snapshot.news_list[0].comment_count == 0
+    # Изменения ждут дольше допустимого: снимок собирается заново.
+    make_snapshot_old(6)
+    snapshot = get_home_snapshot()
+    assert snapshot.version != version
+    assert snapshot.news_list[0].comment_count == 5
+
+
+def test_snapshot_age_is_bounded_without_signals(news, settings):
+    """Запись, о которой процесс не узнал, попадает на главную.
+
+    Так пишут другие процессы и manage.py import_news.
+    """
+    settings.HOME_SNAPSHOT_MAX_STALENESS = 5
+    get_home_snapshot()
+    News.objects.bulk_create([News(title='Из другого процесса', text='')])
+    assert len(get_home_snapshot().news_list) == 1
+    make_snapshot_old(6)
+    assert len(get_home_snapshot().news_list) == 2
+
+
+def test_unchanged_rebuild_keeps_version(news_page, settings):
+    """Пересборка без изменений не сбрасывает условные запросы."""
+    settings.HOME_SNAPSHOT_MAX_STALENESS = 5
+    version = get_home_snapshot().version
+    make_snapshot_old(6)
+    snapshot = get_home_snapshot()
+    assert time.time() - snapshot.built < 1
+    assert snapshot.version == version
@@ -0,0 +1,59 @@
+import importlib
+import io
+import os
+import sys
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from yanews.template_cache import project_template_names, warm_templates
+
+
+def load_production_settings(secret_key):
+    """Заново импортирует рабочий профиль с заданным окружением."""
+    sys.modules.pop('yanews.settings_production', None)
+    with mock.patch.dict(os.environ):
+        os.environ.pop('DJANGO_SECRET_KEY', None)
+        if secret_key is not None:
+            os.environ['DJANGO_SECRET_KEY'] = secret_key
+        return importlib.import_module('yanews.settings_production')
+
+
+def test_production_secret_key_from_environment():
+    """Рабочий профиль не запускается с ключом из репозитория."""
+    with pytest.raises(ImproperlyConfigured):
+        load_production_settings(None)
+    assert load_production_settings('ключ').SECRET_KEY == 'ключ'
+
+
+def test_check_templates_command():
+    """Все шаблоны проекта разбираются без ошибок."""
+    stdout = io.StringIO()
+    call_command('check_templates', stdout=stdout)
+    assert f'разобрано: {len(project_template_names())}' in stdout.getvalue()
+
+
+def test_check_templates_reports_errors(tmp_path, settings):
+    (tmp_path / 'good.html').write_text('{% include "broken.html" %}')
+    (tmp_path / 'broken.html').write_text('{% if %}')
+    (tmp_path / 'missing.html').write_text('{% extends "nope.html" %}')
+    settings.TEMPLATES = [{**settings.TEMPLATES[0], 'DIRS': [tmp_path]}]
+    stderr = io.StringIO()
+    with pytest.raises(CommandError, match='2 из 3'):
+        call_command('check_templates', stdout=io.StringIO(), stderr=stderr)
+    errors = stderr.getvalue().splitlines()
+    assert errors[0].startswith('broken.html:')
+    assert errors[1] == 'missing.html: нет шаблона nope.html'
+
+
+def test_warm_templates_fills_cached_loader(settings):
+    settings.TEMPLATES = load_production_settings('ключ').TEMPLATES
+    loader, = engines['django'].engine.template_loaders
+    names = project_template_names()
+    assert warm_templates(budget=0) == 0
+    assert not loader.get_template_cache
+    assert warm_templates(budget=60) == len(names)
+    assert set(loader.get_template_cache) == set(names)
@@ -1,13 +1,29 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.template.loader import get_template
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .caching import get_cached_comment_page, render_comments
+from .conditional import (
+    get_news_state, get_request_home_snapshot, home_etag, home_last_modified,
+    news_etag, news_last_modified
+)
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import (
+    comments_after, get_comment_page, iter_comment_chunks
+)
 
 
+@method_decorator(
+    condition(etag_func=home_etag, last_modified_func=home_last_modified),
+    name='get'
+)
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
@@ -17,23 +33,50 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Список
+        берётся из снимка главной в кеше без запросов к базе.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return get_request_home_snapshot(self.request).news_list
 
 
-class NewsDetail(generic.DetailView):
+class CommentPageMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
+
+    def get_comments(self):
+        return Comment.objects.filter(
+            news_id=self.kwargs['pk']
+        ).select_related('author')
+
+    def get_cursor(self):
+        """На странице новости комментарии выводятся с самого начала."""
+        return None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        cursor = self.get_cursor()
+        context['comments'], context['next_cursor'] = (
+            get_cached_comment_page(
+                self.kwargs['pk'],
+                get_news_state(self.request, self.kwargs['pk']),
+                cursor,
+                lambda: get_comment_page(
+                    self.get_comments(), settings.COMMENTS_PAGE_SIZE, cursor
+                )
+            )
+        )
+        return context
+
+
+@method_decorator(
+    condition(etag_func=news_etag, last_modified_func=news_last_modified),
+    name='get'
+)
+class NewsDetail(CommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -42,8 +85,47 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(CommentPageMixin, generic.DetailView):
+    """Фрагмент ветки комментариев для кнопки «Показать ещё».
+
+    С параметром stream отдаёт все оставшиеся комментарии потоком,
+    отрисовывая их порциями по мере чтения из базы.
+    """
+    model = News
+    template_name = 'news/comments.html'
+
+    def get_object(self, queryset=None):
+        return get_object_or_404(
+            self.model.objects.only('pk'), pk=self.kwargs['pk']
+        )
+
+    def get_cursor(self):
+        return self.request.GET.get('after')
+
+    def get(self, request, *args, **kwargs):
+        if 'stream' not in request.GET:
+            return super().get(request, *args, **kwargs)
+        self.object = self.get_object()
+        return StreamingHttpResponse(self.stream_comments())
+
+    def stream_comments(self):
+        template = get_template(self.template_name)
+        chunks = iter_comment_chunks(
+            comments_after(self.get_comments(), self.get_cursor()),
+            settings.COMMENTS_PAGE_SIZE
+        )
+        return (
+            template.render(
+                {'news': self.object, 'comments': render_comments(chunk)},
+                self.request
+            )
+            for chunk in chunks
+        )
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -63,19 +145,20 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    """Страница новости: GET показывает её, POST добавляет комментарий.
 
-    def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
-
-    def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+    Представления для методов собираются один раз при импорте модуля,
+    а не заново на каждый запрос. View.dispatch() вызывает их с теми же
+    аргументами, что и обычные обработчики, HEAD обслуживается как GET.
+    """
+    get = staticmethod(NewsDetail.as_view())
+    post = staticmethod(NewsComment.as_view())
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +166,16 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен представлением, новость не нужна."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -0,0 +1,85 @@
+"""SQLite, настроенный для работы под нагрузкой.
+
+Каждое новое соединение получает прагмы из PRAGMAS: журнал WAL
+(читатели не ждут писателя), synchronous=NORMAL, отображение файла
+в память, увеличенный кеш страниц и ожидание блокировки. Их можно
+переопределить в OPTIONS['pragmas'] настроек базы.
+
+Транзакции начинаются с BEGIN IMMEDIATE: блокировка на запись берётся
+сразу, и ожидание busy_timeout работает, вместо мгновенной ошибки
+при повышении блокировки чтения до записи. Запросы вне транзакции,
+получившие «database is locked», повторяются с паузой.
+"""
+import time
+
+from django.db.backends.sqlite3 import base
+
+LOCKED_ATTEMPTS = 3
+LOCKED_BACKOFF = 0.05
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+}
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+
+    def execute(self, query, params=None):
+        return self.db.retry_locked(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        # Генератор параметров не пережил бы повтор.
+        return self.db.retry_locked(
+            super().executemany, query, list(param_list)
+        )
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = {
+            **PRAGMAS, **self.settings_dict['OPTIONS'].get('pragmas', {})
+        }
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.db = self
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
+
+    def retry_locked(self, execute, *args):
+        """Повторяет запрос, пока база занята другим писателем.
+
+        Внутри транзакции повтор одного запроса ничего не исправит,
+        поэтому там ошибка отдаётся сразу.
+        """
+        for attempt in range(LOCKED_ATTEMPTS):
+            try:
+                return execute(*args)
+            except base.Database.OperationalError as error:
+                if (
+                    not is_locked(error)
+                    or not self.autocommit
+                    or attempt == LOCKED_ATTEMPTS - 1
+                ):
+                    raise
+            time.sleep(LOCKED_BACKOFF * 2 ** attempt)
@@ -0,0 +1,351 @@
+"""Учёт SQL-запросов и времени отрисовки по представлениям.
+
+Для доли запросов QUERY_BUDGET_SAMPLE_RATE считает количество
+запросов к базе, время в базе, повторяющиеся запросы (признак N+1)
+и время отрисовки шаблона. Результат отдаётся в заголовке
+Server-Timing и копится в сводке по именам URL, которая раз
+в QUERY_BUDGET_FLUSH_INTERVAL секунд пишется в JSON-файл. Сводка
+у каждого процесса своя, поэтому и файл свой: к имени из
+QUERY_BUDGET_REPORT_PATH перед расширением добавляется pid,
+например query_budget.1234.json.
+
+Под ASGI промежуточный слой работает асинхронно, а запросы к базе
+выполняются в других потоках. Статистика текущего запроса поэтому
+хранится в контекстной переменной: asgiref копирует её в поток
+вместе с вызовом, и обёртка на каждом соединении находит её там.
+
+Здесь же PrimaryPinMiddleware для маршрутизатора реплик из routers.py,
+RateLimitMiddleware для ограничения частоты записи из ratelimit.py
+и CachedAuthenticationMiddleware с кешем пользователей из usercache.py.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .ratelimit import TokenBucketLimiter
+from .routers import primary_pinned
+from .usercache import user_cache
+
+UNRESOLVED = '<unresolved>'
+PIN_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+TOO_MANY_REQUESTS = 429
+
+
+class QueryStats:
+    """Запросы к базе в рамках одного HTTP-запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # Параметры не входят в SQL: одинаковый текст — один запрос.
+            self.signatures[sql] += 1
+
+    def duplicates(self, threshold):
+        return {
+            sql: count for sql, count in self.signatures.items()
+            if count >= threshold
+        }
+
+
+class QueryBudgetReport:
+    """Сводка по именам URL, общая для всех потоков процесса."""
+
+    def __init__(self, path, flush_interval):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.views = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, view_name, stats, render_time, duplicates):
+        with self.lock:
+            entry = self.views.setdefault(view_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'db_time': 0.0,
+                'render_time': 0.0,
+                'duplicates': {},
+            })
+            entry['requests'] += 1
+            entry['queries'] += stats.count
+            entry['max_queries'] = max(entry['max_queries'], stats.count)
+            entry['db_time'] += stats.duration
+            entry['render_time'] += render_time
+            for sql, count in duplicates.items():
+                entry['duplicates'][sql] = max(
+                    entry['duplicates'].get(sql, 0), count
+                )
+            due = time.monotonic() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def process_path(self):
+        """Файл сводки этого процесса."""
+        root, extension = os.path.splitext(self.path)
+        return f'{root}.{os.getpid()}{extension}'
+
+    def flush(self):
+        with self.lock:
+            self.last_flush = time.monotonic()
+            content = json.dumps(self.views, ensure_ascii=False, indent=2)
+        path = self.process_path()
+        # Пишем во временный файл, чтобы читатель не увидел половину отчёта.
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as report_file:
+            report_file.write(content)
+        os.replace(temp_path, path)
+
+
+current_stats = ContextVar('query_budget_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_wrapper(sender=None, connection=None, **kwargs):
+    """Ставит record_query на соединение один раз и самым внешним."""
+    # Снаружи, чтобы не мешать pop() во вложенных execute_wrapper().
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(install_wrapper)
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознаёт асинхронный экземпляр.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            # Асинхронный обработчик вызывал бы этот хук через поток.
+            self.process_template_response = self.time_rendering
+        self.sample_rate = settings.QUERY_BUDGET_SAMPLE_RATE
+        self.duplicate_threshold = settings.QUERY_BUDGET_DUPLICATE_THRESHOLD
+        self.report = None
+        if settings.QUERY_BUDGET_REPORT_PATH:
+            self.report = QueryBudgetReport(
+                settings.QUERY_BUDGET_REPORT_PATH,
+                settings.QUERY_BUDGET_FLUSH_INTERVAL
+            )
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        # Соединения могли открыться до загрузки этого модуля.
+        for connection in connections.all():
+            install_wrapper(connection=connection)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response)
+
+    def start(self, request):
+        request.query_stats = QueryStats()
+        request.query_budget_render_time = 0.0
+        return current_stats.set(request.query_stats)
+
+    def finish(self, request, response):
+        stats = request.query_stats
+        render_time = request.query_budget_render_time
+        duplicates = stats.duplicates(self.duplicate_threshold)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={stats.duration * 1000:.2f};'
+            f'desc="{stats.count} queries"',
+            f'tpl;dur={render_time * 1000:.2f}',
+            f'dup;desc="{len(duplicates)} repeated"',
+        ))
+        if self.report is not None:
+            match = request.resolver_match
+            self.report.add(
+                match.view_name if match else UNRESOLVED,
+                stats, render_time, duplicates
+            )
+        return response
+
+    def time_rendering(self, request, response):
+        """Шаблон отрисуется сразу после этого хука."""
+        if not hasattr(request, 'query_budget_render_time'):
+            return response
+        start = time.perf_counter()
+
+        def rendered(response):
+            request.query_budget_render_time = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class PrimaryPinMiddleware:
+    """Читает из основной базы при записи и недолго после неё."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        token = primary_pinned.set(self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        return self.remember(request, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        token = primary_pinned.set(self.is_pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        return self.remember(request, response)
+
+    def is_pinned(self, request):
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def remember(self, request, response):
+        seconds = settings.REPLICA_PIN_SECONDS
+        if request.method not in SAFE_METHODS and seconds:
+            # Срок в значении: время в cookie проверяет сервер, а не браузер.
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + seconds:.3f}',
+                max_age=seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 на запись чаще, чем разрешено в RATE_LIMITS.
+
+    У каждого имени URL две корзины: пользователя и IP-адреса.
+    Корзина пользователя не зависит от сессии и после повторного
+    входа остаётся прежней. id пользователя читается из подписанной
+    cookie сессии без запроса к базе, поэтому отказ не стоит
+    ни одного запроса к ней. Корзина адреса в RATE_LIMIT_IP_FACTOR
+    раз больше, ведь за одним адресом бывает много пользователей.
+    Она ограничивает запись без входа и с множества учётных записей.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        self.limiter = TokenBucketLimiter()
+
+    def __call__(self, request):
+        # Под ASGI вернётся корутина, её дождётся внешний слой.
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS:
+            return None
+        limit = settings.RATE_LIMITS.get(request.resolver_match.view_name)
+        if limit is None:
+            return None
+        rate, burst = limit
+        factor = settings.RATE_LIMIT_IP_FACTOR
+        buckets = [
+            ('ip', request.META.get('REMOTE_ADDR', ''), rate * factor,
+             burst * factor),
+        ]
+        user_id = request.session.get(auth.SESSION_KEY)
+        if user_id is not None:
+            buckets.insert(0, ('user', user_id, rate, burst))
+        for kind, client, bucket_rate, bucket_burst in buckets:
+            key = hashlib.md5(':'.join((
+                request.resolver_match.view_name, kind, str(client)
+            )).encode()).hexdigest()
+            wait = self.limiter.acquire(key, bucket_rate, bucket_burst)
+            if wait:
+                return self.too_many_requests(wait)
+        return None
+
+    def too_many_requests(self, wait):
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже.',
+            status=TOO_MANY_REQUESTS
+        )
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = user_cache.get_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущий пользователя из кеша процесса.
+
+    Подкласс, чтобы проверки django.contrib.admin узнавали его.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -0,0 +1,47 @@
+"""Чтение с реплик, запись — в основную базу.
+
+Реплики перечисляются в DATABASE_REPLICAS псевдонимами из DATABASES.
+Пока список пуст, всё идёт в default. Запрос, который пишет, и запросы
+того же клиента в течение REPLICA_PIN_SECONDS после него читают
+из основной базы: реплика могла ещё не получить его изменения.
+Закрепление ставит PrimaryPinMiddleware, а вне HTTP-запросов —
+контекстный менеджер use_primary().
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+primary_pinned = ContextVar('primary_pinned', default=False)
+
+
+@contextmanager
+def use_primary():
+    token = primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        primary_pinned.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or primary_pinned.get()
+            # Чтение внутри пишущей транзакции должно видеть её изменения.
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплики содержат те же данные, что и основная база."""
+        return True
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,11 +22,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.middleware.QueryBudgetMiddleware',
+    'yanews.middleware.PrimaryPinMiddleware',
+    'yanews.middleware.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yanews.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -50,17 +54,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
+# Прогрев шаблонов при старте, включён в settings_production.py.
+TEMPLATE_WARMUP_SECONDS = 0
+
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL и прагмы — в yanews/backends/sqlite3/base.py.
+        'ENGINE': 'yanews.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт в потоке обработчика между запросами.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики для чтения — псевдонимы из DATABASES, например:
+# DATABASES['replica'] = {'ENGINE': ..., 'NAME': ..., 'TEST': {'MIRROR':
+# 'default'}} и DATABASE_REPLICAS = ['replica'].
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['yanews.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Частота записи по имени URL: (токенов в секунду, запас корзины).
+RATE_LIMITS = {
+    'news:detail': (0.2, 10),
+    'news:edit': (0.2, 10),
+    'news:delete': (0.2, 10),
+}
+# Во сколько раз корзина IP-адреса больше корзины пользователя.
+RATE_LIMIT_IP_FACTOR = 10
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
+# Сессия целиком в подписанной cookie: чтение сессии не стоит запроса
+# к базе. Выход очищает cookie у клиента, но сохранённая до выхода
+# копия cookie остаётся действительной до SESSION_COOKIE_AGE или смены
+# пароля.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+# Сколько секунд процесс доверяет пользователю из своего кеша,
+# см. yanews/usercache.py.
+AUTH_USER_CACHE_TTL = 30
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -80,3 +116,34 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_PAGE_SIZE = 50
+
+BAD_WORDS_FILE = None
+BAD_WORDS_MATCHER = 'news.profanity.AhoCorasickMatcher'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Правка текста комментария в другом процессе попадает в кеш страниц
+# комментариев этого процесса не позже чем через столько секунд.
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60
+
+# Снимок главной пересобирается не чаще раза в HOME_SNAPSHOT_DEBOUNCE
+# секунд и отстаёт от базы не больше чем на HOME_SNAPSHOT_MAX_STALENESS.
+HOME_SNAPSHOT_DEBOUNCE = 1
+HOME_SNAPSHOT_MAX_STALENESS = 5
+
+# Асинхронные представления новостей под ASGI: по умолчанию выключены,
+# включаются переменной окружения NEWS_ASYNC_VIEWS=1, см. news/async_views.py.
+NEWS_ASYNC_VIEWS = os.environ.get('NEWS_ASYNC_VIEWS') == '1'
+NEWS_ASYNC_DB_THREADS = 16
+
+QUERY_BUDGET_SAMPLE_RATE = 1.0
+QUERY_BUDGET_DUPLICATE_THRESHOLD = 3
+QUERY_BUDGET_REPORT_PATH = None
+QUERY_BUDGET_FLUSH_INTERVAL = 60
@@ -0,0 +1,90 @@
+"""Прогрев и проверка шаблонов проекта.
+
+В рабочем профиле настроек (settings_production.py) шаблоны загружает
+cached.Loader: каждый шаблон читается с диска и разбирается один раз
+на процесс. warm_templates() вызывается из wsgi.py и asgi.py при
+старте и заранее загружает шаблоны из TEMPLATES['DIRS'], чтобы первые
+запросы не платили за разбор. Прогрев ограничен по времени
+TEMPLATE_WARMUP_SECONDS: что не успело загрузиться, загрузится
+при первом обращении.
+
+check_templates() разбирает каждый шаблон и проверяет, что шаблоны
+из {% extends %} и {% include %} с именем-строкой существуют.
+"""
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import (
+    TemplateDoesNotExist, TemplateSyntaxError, engines
+)
+from django.template.base import Variable
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+
+def project_template_names(engine=None):
+    """Имена всех шаблонов из каталогов TEMPLATES['DIRS']."""
+    engine = engine or engines['django'].engine
+    names = []
+    for directory in map(Path, engine.dirs):
+        names.extend(
+            path.relative_to(directory).as_posix()
+            for path in sorted(directory.rglob('*')) if path.is_file()
+        )
+    return names
+
+
+def warm_templates(budget=None):
+    """Загружает шаблоны в кеш загрузчика, пока не истечёт budget секунд.
+
+    Возвращает число загруженных шаблонов.
+    """
+    if budget is None:
+        budget = getattr(settings, 'TEMPLATE_WARMUP_SECONDS', 0)
+    if budget <= 0:
+        return 0
+    engine = engines['django'].engine
+    deadline = time.monotonic() + budget
+    warmed = 0
+    for name in project_template_names(engine):
+        if time.monotonic() >= deadline:
+            break
+        engine.get_template(name)
+        warmed += 1
+    return warmed
+
+
+def constant_name(expression):
+    """Имя шаблона, если оно задано строкой без фильтров."""
+    if isinstance(expression.var, Variable) or expression.filters:
+        return None
+    return str(expression.var)
+
+
+def referenced_names(template):
+    for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+        yield constant_name(node.parent_name)
+    for node in template.nodelist.get_nodes_by_type(IncludeNode):
+        yield constant_name(node.template)
+
+
+def check_templates(engine=None):
+    """Разбирает все шаблоны проекта, возвращает (число, ошибки)."""
+    engine = engine or engines['django'].engine
+    names = project_template_names(engine)
+    errors = []
+    for name in names:
+        try:
+            template = engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors.append(f'{name}: {error}')
+            continue
+        for referenced in filter(None, referenced_names(template)):
+            try:
+                engine.get_template(referenced)
+            except TemplateDoesNotExist:
+                errors.append(f'{name}: нет шаблона {referenced}')
+            except TemplateSyntaxError:
+                # Ошибка в шаблоне проекта попадёт в отчёт под его именем.
+                pass
+    return len(names), errors
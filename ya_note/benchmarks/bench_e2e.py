@@ -0,0 +1,140 @@
+"""Сквозной замер всех URL приложения notes.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.bench_e2e --sizes 1 1000 1000000
+    python -m benchmarks.bench_e2e --save-baseline
+
+Для объёма N у пользователя создаются N заметок с индексом поиска.
+Сценарии записи работают со своими заметками: add создаёт заметку
+add-i, edit:post и delete:post меняют и удаляют её, так же bulk_add,
+bulk_edit и bulk_delete обходятся с пачкой bulk-i-*. Полная выгрузка
+на больших объёмах дорогая, поэтому её запросов меньше. По умолчанию
+замеряются объёмы до 100 000 заметок: на миллионе одна выгрузка
+идёт больше десяти секунд, и такой объём стоит задавать явно. Результат
+сравнивается с benchmarks/baseline_e2e.json, подробности —
+в e2e_bench.py в корне репозитория.
+"""
+import os
+import sys
+
+# Общая часть замеров одна на оба проекта и лежит в корне репозитория.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+))))
+
+from e2e_bench import (  # noqa: E402
+    BenchProject, Scenario, get, main, post_form, post_json, session_cookie
+)
+
+BULK_SIZE = 50
+EXPORT_REQUESTS = 2
+
+
+def seed_notes(author, size):
+    # Через модели миллион заметок создавался бы слишком долго.
+    # Индекс поиска заполняют триггеры базы.
+    from django.db import connection
+    from django.utils import timezone
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'WITH RECURSIVE seq(n) AS ('
+            ' SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s'
+            ') INSERT INTO notes_note (title, text, slug, author_id, '
+            'updated) SELECT \'Заметка \' || n, \'Текст заметки \' || n, '
+            '\'note-\' || n, %s, %s FROM seq',
+            (size, author.pk,
+             connection.ops.adapt_datetimefield_value(timezone.now()))
+        )
+
+
+def note_form(slug, title):
+    return {'title': title, 'text': 'Текст заметки', 'slug': slug}
+
+
+def bulk_slugs(i):
+    return [f'bulk-{i}-{number}' for number in range(BULK_SIZE)]
+
+
+def seed(size, capacity):
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    author = get_user_model().objects.create(username='bench')
+    seed_notes(author, size)
+    cookie = session_cookie(author)
+    middle = f'note-{max(1, size // 2)}'
+    return [
+        Scenario('home', lambda i: get(reverse('notes:home'))),
+        Scenario('list', lambda i: get(reverse('notes:list')), cookie),
+        Scenario(
+            'list:search',
+            lambda i: get(reverse('notes:list') + f'?q={size // 3 + 1}'),
+            cookie
+        ),
+        Scenario(
+            'detail',
+            lambda i: get(reverse('notes:detail', args=(middle,))),
+            cookie
+        ),
+        Scenario(
+            'export',
+            lambda i: get(reverse('notes:export')),
+            cookie, EXPORT_REQUESTS
+        ),
+        Scenario('success', lambda i: get(reverse('notes:success')), cookie),
+        Scenario(
+            'add:post',
+            lambda i: post_form(
+                reverse('notes:add'), note_form(f'add-{i}', f'Новая {i}')
+            ),
+            cookie
+        ),
+        Scenario(
+            'edit:post',
+            lambda i: post_form(
+                reverse('notes:edit', args=(f'add-{i}',)),
+                note_form(f'add-{i}', f'Исправленная {i}')
+            ),
+            cookie
+        ),
+        Scenario(
+            'delete:post',
+            lambda i: post_form(
+                reverse('notes:delete', args=(f'add-{i}',)), {}
+            ),
+            cookie
+        ),
+        Scenario(
+            'bulk_add:post',
+            lambda i: post_json(reverse('notes:bulk_add'), [
+                note_form(slug, f'Пачка {slug}') for slug in bulk_slugs(i)
+            ]),
+            cookie
+        ),
+        Scenario(
+            'bulk_edit:post',
+            lambda i: post_json(reverse('notes:bulk_edit'), [
+                {'slug': slug, 'title': f'Исправленная {slug}'}
+                for slug in bulk_slugs(i)
+            ]),
+            cookie
+        ),
+        Scenario(
+            'bulk_delete:post',
+            lambda i: post_json(reverse('notes:bulk_delete'), bulk_slugs(i)),
+            cookie
+        ),
+    ]
+
+
+PROJECT = BenchProject(
+    module='benchmarks.bench_e2e',
+    settings='yanote.settings',
+    sizes=(1, 1000, 100000),
+    baseline=os.path.join(os.path.dirname(__file__), 'baseline_e2e.json'),
+    seed=seed,
+)
+
+if __name__ == '__main__':
+    main(PROJECT)
@@ -0,0 +1,93 @@
+"""Время страницы списка заметок при разном числе заметок.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.bench_notes_list --sizes 10000 100000 1000000
+
+Заметки создаются во временной тестовой базе одного пользователя.
+Для каждого размера измеряются первая страница, страница из середины,
+последняя страница и поиск редкого слова. Поиск частого слова
+пропорционален числу совпадений, а не числу заметок.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+BATCH_SIZE = 10000
+
+
+def seed_notes(author, start, stop):
+    # Индекс поиска заполняют триггеры базы.
+    from notes.models import Note
+
+    for batch_start in range(start, stop, BATCH_SIZE):
+        batch_stop = min(batch_start + BATCH_SIZE, stop)
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', slug=f'note-{index}',
+                 text=f'Текст заметки номер {index}', author=author)
+            for index in range(batch_start, batch_stop)
+        )
+
+
+def measure(view, author, params, repeat):
+    from django.test import RequestFactory
+
+    timings = []
+    for _ in range(repeat):
+        request = RequestFactory().get('/notes/', params)
+        request.user = author
+        start = time.perf_counter()
+        view(request).render()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=(10000, 100000, 1000000)
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from notes.models import Note
+    from notes.views import NotesList
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        author = get_user_model().objects.create(username='bench')
+        view = NotesList.as_view()
+        seeded = 0
+        print(f'{"заметок":>10} {"первая":>9} {"середина":>9} '
+              f'{"последняя":>9} {"поиск":>9}  (мс, медиана)')
+        for size in sorted(args.sizes):
+            seed_notes(author, seeded, size)
+            seeded = size
+            ids = Note.objects.order_by('id').values_list('id', flat=True)
+            middle_id = ids[size // 2]
+            last_id = ids[size - 2]
+            results = [
+                measure(view, author, params, args.repeat)
+                for params in (
+                    {},
+                    {'after': middle_id},
+                    {'after': last_id},
+                    {'q': str(size // 3)},
+                )
+            ]
+            print(f'{size:>10} ' + ' '.join(f'{ms:>9.2f}' for ms in results))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
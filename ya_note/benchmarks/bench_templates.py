@@ -0,0 +1,90 @@
+"""Время отрисовки страниц без кеша шаблонов и с ним.
+
+Запуск из каталога ya_note:
+    python -m benchmarks.bench_templates --number 500
+
+Профиль «разработка» — TEMPLATES из yanote/settings.py с DEBUG = True:
+шаблоны читаются с диска и разбираются при каждой отрисовке. Сам
+settings.py выключает DEBUG, и при этом Django 3.2 неявно включает
+cached.Loader, так что замер показывает цену отладочного режима.
+Профиль «рабочий» — TEMPLATES из yanote/settings_production.py:
+cached.Loader, прогретый так же, как при старте процесса. Замеряется
+то же, что делает представление: get_template() и render() с запросом,
+без обращений к базе.
+"""
+import argparse
+import os
+import time
+import timeit
+
+import django
+
+NOTES_ON_PAGE = 50
+
+
+def make_backend(templates, debug):
+    from django.template.backends.django import DjangoTemplates
+
+    params = {**templates[0], 'NAME': 'django'}
+    del params['BACKEND']
+    params['OPTIONS'] = {**params['OPTIONS'], 'debug': debug}
+    return DjangoTemplates(params)
+
+
+def make_pages(backend):
+    """Шаблон и контекст для списка, заметки и формы."""
+    from notes.forms import NoteForm
+    from notes.models import Note
+
+    notes = [
+        Note(pk=pk, title=f'Заметка {pk}', text='Текст.', slug=f'note-{pk}')
+        for pk in range(1, NOTES_ON_PAGE + 1)
+    ]
+    return {
+        'home': ('notes/home.html', {}),
+        'list': ('notes/list.html', {
+            'object_list': notes, 'next_after': NOTES_ON_PAGE,
+        }),
+        'detail': ('notes/detail.html', {'note': notes[0]}),
+        'form': ('notes/form.html', {'form': NoteForm()}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+
+    # Ключ рабочему профилю обязателен, а для отрисовки безразличен.
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'bench_templates')
+    from yanote import settings, settings_production
+    from yanote.template_cache import project_template_names
+
+    request = RequestFactory().get('/')
+    request.user = get_user_model()(pk=1, username='bench')
+    profiles = {
+        'разработка': make_backend(settings.TEMPLATES, debug=True),
+        'рабочий': make_backend(settings_production.TEMPLATES, debug=False),
+    }
+    for profile, backend in profiles.items():
+        start = time.perf_counter()
+        for name in project_template_names(backend.engine):
+            backend.get_template(name)
+        warmup = time.perf_counter() - start
+        print(f'{profile}: загрузка всех шаблонов {warmup * 1000:.1f} мс')
+        for page, (name, context) in make_pages(backend).items():
+            best = min(timeit.repeat(
+                lambda: backend.get_template(name).render(context, request),
+                number=args.number, repeat=args.repeat
+            )) / args.number
+            print(f'{page:>10}: {best * 1000:7.3f} мс на отрисовку')
+
+
+if __name__ == '__main__':
+    main()
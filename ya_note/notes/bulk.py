@@ -0,0 +1,215 @@
+"""Массовые операции с заметками пользователя.
+
+Все элементы запроса проверяются за один проход, ошибки собираются
+по номерам элементов. Занятость slug проверяется одним запросом IN
+на весь запрос, а не exists() на каждую заметку, как в NoteForm.
+Изменения применяются bulk_create(), bulk_update() и удалением
+по фильтру в одной транзакции: выполняется либо весь запрос,
+либо ничего. Индекс поиска обновляют триггеры в базе, а версию
+списка заметок, о которой bulk_create() и bulk_update() сигналами
+не сообщают, — код ниже.
+"""
+import json
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .conditional import bump_notes_version
+from .forms import WARNING, NoteForm
+from .models import Note
+from .slugs import (
+    SlugAllocator, group_by_base, slug_candidates_filter, slugify_title
+)
+
+# На каждую основу slug в запросе уходит три параметра,
+# а SQLite по умолчанию принимает не больше 999.
+CANDIDATES_CHUNK_SIZE = 300
+NON_ITEM_ERRORS = '__all__'
+RACE_ERROR = 'Slug заняли во время сохранения, повторите запрос.'
+NOT_FOUND = 'Заметка не найдена.'
+REPEATED = 'Заметка указана в запросе несколько раз.'
+SLUG_REQUIRED = 'Новый slug не может быть пустым.'
+SLUG_NOT_STRING = 'Slug заметки должен быть строкой.'
+
+
+class BulkError(Exception):
+    """Ошибки по элементам: {номер: {поле: [сообщения]}}."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class BulkNoteForm(NoteForm):
+    """Проверка одной заметки без запросов к базе.
+
+    Уникальность slug проверяется сразу для всех заметок запроса.
+    """
+
+    def clean_slug(self):
+        return self.cleaned_data.get('slug')
+
+    def validate_unique(self):
+        pass
+
+
+def parse_items(body, item_type):
+    """Список элементов из JSON-тела запроса."""
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise BulkError({NON_ITEM_ERRORS: ['Тело запроса — не JSON.']})
+    if not isinstance(items, list) or not all(
+        isinstance(item, item_type) for item in items
+    ):
+        raise BulkError({NON_ITEM_ERRORS: ['Ожидался список элементов.']})
+    if len(items) > settings.NOTES_BULK_MAX_ITEMS:
+        raise BulkError({NON_ITEM_ERRORS: [
+            f'Не больше {settings.NOTES_BULK_MAX_ITEMS} элементов за раз.'
+        ]})
+    return items
+
+
+def form_errors(form):
+    return {field: list(messages) for field, messages in form.errors.items()}
+
+
+def check_slugs(notes, errors):
+    """Заданные slug не повторяются в запросе и не заняты в базе."""
+    slugs = {index: note.slug for index, note in notes.items() if note.slug}
+    counts = Counter(slugs.values())
+    taken = set(Note.objects.filter(
+        slug__in=list(counts)
+    ).values_list('slug', flat=True))
+    for index, slug in slugs.items():
+        if slug in taken or counts[slug] > 1:
+            errors[index] = {'slug': [slug + WARNING]}
+
+
+def fill_blank_slugs(notes):
+    """Свободные slug из заголовков для заметок без slug.
+
+    Занятые slug всех основ читаются порциями по CANDIDATES_CHUNK_SIZE
+    основ, после чего номера выдаются по счётчикам в памяти.
+    """
+    max_length = Note._meta.get_field('slug').max_length
+    blank = [note for note in notes if not note.slug]
+    bases = [slugify_title(note.title, max_length) for note in blank]
+    unique_bases = list(set(bases))
+    taken = {note.slug for note in notes if note.slug}
+    for start in range(0, len(unique_bases), CANDIDATES_CHUNK_SIZE):
+        chunk = unique_bases[start:start + CANDIDATES_CHUNK_SIZE]
+        taken.update(Note.objects.filter(
+            reduce(or_, map(slug_candidates_filter, chunk))
+        ).values_list('slug', flat=True))
+    allocator = SlugAllocator(Note.objects.all(), max_length, taken)
+    for base, base_taken in group_by_base(taken, unique_bases).items():
+        allocator.load(base, base_taken)
+    for note, base in zip(blank, bases):
+        note.slug = allocator.allocate(base)
+
+
+def raise_errors(errors):
+    if errors:
+        raise BulkError({str(index): error for index, error in errors.items()})
+
+
+def create_notes(author, items):
+    """Создаёт заметки; вернёт их slug в порядке элементов."""
+    errors = {}
+    notes = {}
+    for index, item in enumerate(items):
+        form = BulkNoteForm(data=item)
+        if form.is_valid():
+            notes[index] = form.instance
+            form.instance.author = author
+        else:
+            errors[index] = form_errors(form)
+    check_slugs(notes, errors)
+    raise_errors(errors)
+    notes = list(notes.values())
+    try:
+        with transaction.atomic():
+            fill_blank_slugs(notes)
+            Note.objects.bulk_create(notes)
+    except IntegrityError:
+        raise BulkError({NON_ITEM_ERRORS: [RACE_ERROR]})
+    bump_notes_version(author.pk)
+    return [note.slug for note in notes]
+
+
+def item_slugs(items, errors):
+    """Slug элементов по номерам; элементы без строки-slug — в errors."""
+    slugs = {}
+    for index, item in enumerate(items):
+        if isinstance(item.get('slug'), str):
+            slugs[index] = item['slug']
+        else:
+            errors[index] = {'slug': [SLUG_NOT_STRING]}
+    return slugs
+
+
+def update_notes(author, items):
+    """Меняет title, text и slug (поле new_slug) заметок по их slug."""
+    errors = {}
+    notes = {}
+    slugs = item_slugs(items, errors)
+    found = Note.objects.filter(
+        author=author, slug__in=list(set(slugs.values()))
+    ).in_bulk(field_name='slug')
+    counts = Counter(slugs.values())
+    for index, slug in slugs.items():
+        item = items[index]
+        note = found.get(slug)
+        if note is None:
+            errors[index] = {'slug': [NOT_FOUND]}
+            continue
+        if counts[note.slug] > 1:
+            errors[index] = {'slug': [REPEATED]}
+            continue
+        old_slug = note.slug
+        form = BulkNoteForm(instance=note, data={
+            'title': item.get('title', note.title),
+            'text': item.get('text', note.text),
+            'slug': item.get('new_slug', note.slug),
+        })
+        if not form.is_valid():
+            errors[index] = form_errors(form)
+        elif not note.slug:
+            errors[index] = {'new_slug': [SLUG_REQUIRED]}
+        elif note.slug != old_slug:
+            notes[index] = note
+    # Проверяются только изменённые slug: свой slug заметка не занимает.
+    check_slugs(notes, errors)
+    raise_errors(errors)
+    notes = list(found.values())
+    now = timezone.now()
+    for note in notes:
+        note.updated = now
+    try:
+        with transaction.atomic():
+            Note.objects.bulk_update(
+                notes, ('title', 'text', 'slug', 'updated')
+            )
+    except IntegrityError:
+        raise BulkError({NON_ITEM_ERRORS: [RACE_ERROR]})
+    bump_notes_version(author.pk)
+    return [note.slug for note in notes]
+
+
+def delete_notes(author, slugs):
+    """Удаляет найденные по slug заметки."""
+    found = dict(Note.objects.filter(
+        author=author, slug__in=slugs
+    ).values_list('slug', 'pk'))
+    raise_errors({
+        index: {'slug': [NOT_FOUND]}
+        for index, slug in enumerate(slugs) if slug not in found
+    })
+    # Сигналы удаления сами обновят версию списка заметок.
+    Note.objects.filter(pk__in=found.values()).delete()
+    return slugs
@@ -0,0 +1,83 @@
+"""Валидаторы для условных GET-запросов к страницам заметок.
+
+Функции вызываются декоратором condition до основного запроса
+к базе и до отрисовки шаблона. Для списка заметок пользователя
+в кеше хранится версия, которую сигналы меняют при любом
+изменении его заметок. Кеш у каждого процесса свой, поэтому
+к версии добавляются число заметок, наибольший id и последнее время
+изменения из базы: их читает один запрос по индексу
+note_author_updated_idx.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Note
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def version_key(author_id):
+    return f'notes:{author_id}:version'
+
+
+def get_notes_version(author_id):
+    return cache.get_or_set(version_key(author_id), time.time_ns, None)
+
+
+def bump_notes_version(author_id):
+    cache.set(version_key(author_id), time.time_ns(), None)
+
+
+def get_note_updated(request, slug):
+    """Время изменения заметки; запоминается на время запроса."""
+    if not hasattr(request, 'note_updated'):
+        request.note_updated = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values_list('updated', flat=True).first()
+    return request.note_updated
+
+
+def note_etag(request, slug):
+    updated = get_note_updated(request, slug)
+    if updated is None:
+        return None
+    return make_etag(request.user.pk, slug, updated.isoformat())
+
+
+def note_last_modified(request, slug):
+    return get_note_updated(request, slug)
+
+
+def get_notes_state(request):
+    """Состояние заметок пользователя; запоминается на время запроса."""
+    if not hasattr(request, 'notes_state'):
+        # Версия читается до базы, как и в остальных кешах проекта.
+        version = get_notes_version(request.user.pk)
+        state = Note.objects.filter(author=request.user).aggregate(
+            count=Count('id'), last_id=Max('id'), updated=Max('updated')
+        )
+        request.notes_state = (
+            state['count'], state['last_id'], state['updated'], version
+        )
+    return request.notes_state
+
+
+def notes_list_etag(request):
+    return make_etag(
+        request.user.pk, request.get_full_path(), *get_notes_state(request)
+    )
+
+
+def notes_list_last_modified(request):
+    """Версия — момент последнего изменения в наносекундах."""
+    *_, updated, version = get_notes_state(request)
+    moment = datetime.fromtimestamp(version / 10 ** 9, tz=timezone.utc)
+    if updated is not None:
+        moment = max(moment, updated)
+    return moment
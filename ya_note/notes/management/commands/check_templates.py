@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yanote.template_cache import check_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны из каталога templates/ и проверяет, что '
+        'шаблоны из {% extends %} и {% include %} существуют. '
+        'Запускается при выкладке.'
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count, errors = check_templates()
+        elapsed = time.perf_counter() - start
+        for error in errors:
+            self.stderr.write(error)
+        if errors:
+            raise CommandError(
+                f'Ошибок в шаблонах: {len(errors)} из {count}.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов разобрано: {count} за {elapsed * 1000:.0f} мс.'
+        ))
@@ -0,0 +1,47 @@
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.export import FORMATS, export_notes
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в CSV или JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--output', default='-', help='файл; по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.NOTES_EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        chunks = export_notes(
+            Note.objects.filter(author=author), options['format'],
+            options['gzip'], options['chunk_size']
+        )
+        if options['output'] == '-':
+            self.write(chunks, sys.stdout.buffer)
+        else:
+            with open(options['output'], 'wb') as output:
+                self.write(chunks, output)
+
+    @staticmethod
+    def write(chunks, output):
+        for chunk in chunks:
+            output.write(chunk)
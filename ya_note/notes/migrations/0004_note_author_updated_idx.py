@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'updated'], name='note_author_updated_idx'),
+        ),
+    ]
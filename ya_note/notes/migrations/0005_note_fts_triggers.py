@@ -0,0 +1,52 @@
+# Generated by Django 3.2.15 on 2026-10-18 21:10
+
+from django.db import migrations
+
+FTS_TABLE = 'notes_note_fts'
+TRIGGERS = {
+    'notes_note_fts_insert': (
+        'AFTER INSERT ON notes_note BEGIN '
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+        'VALUES (new.id, new.title, new.text); END'
+    ),
+    'notes_note_fts_update': (
+        'AFTER UPDATE OF title, text ON notes_note BEGIN '
+        f'UPDATE {FTS_TABLE} SET title = new.title, text = new.text '
+        'WHERE rowid = new.id; END'
+    ),
+    'notes_note_fts_delete': (
+        'AFTER DELETE ON notes_note BEGIN '
+        f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END'
+    ),
+}
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, body in TRIGGERS.items():
+        schema_editor.execute(f'CREATE TRIGGER {name} {body}')
+    # Индекс мог разойтись с таблицей из-за записи в обход сигналов.
+    schema_editor.execute(f'DELETE FROM {FTS_TABLE}')
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM notes_note'
+    )
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_author_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.db import models
 
-from pytils.translit import slugify
+from .slugs import save_with_unique_slug
 
 
 class Note(models.Model):
@@ -27,12 +27,22 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        indexes = (
+            # Состояние списка заметок для условных запросов.
+            models.Index(
+                fields=('author', 'updated'), name='note_author_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_unique_slug(
+            self, lambda: super(Note, self).save(*args, **kwargs)
+        )
@@ -0,0 +1,35 @@
+"""Полнотекстовый поиск по заметкам.
+
+В SQLite заголовки и тексты заметок лежат в виртуальной таблице
+FTS5, rowid которой совпадает с id заметки. Таблицу и триггеры,
+которые держат её в актуальном виде при любой записи в notes_note,
+в том числе массовой и в обход моделей, создают миграции. На других
+базах поиск идёт обычным icontains.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'notes_note_fts'
+
+
+def fts_enabled(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Каждое слово запроса ищется как префикс, синтаксис FTS не нужен."""
+    terms = (term.replace('"', '""') for term in query.split())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_notes(queryset, query):
+    """Заметки из queryset, в заголовке или тексте которых есть query."""
+    if not fts_enabled(queryset.db):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        )
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match_expression(query),)
+    ))
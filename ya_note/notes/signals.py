@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .conditional import bump_notes_version
+from .models import Note
+
+
+@receiver((post_save, post_delete), sender=Note)
+def note_changed(sender, instance, **kwargs):
+    bump_notes_version(instance.author_id)
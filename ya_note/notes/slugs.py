@@ -0,0 +1,146 @@
+"""Уникальные slug для заметок.
+
+Slug из заголовка получается один раз. Занятость проверяется одним
+запросом по диапазону уникального индекса между base и base-N:
+из базы приходят только сам base, если он занят, и base-N
+с наибольшим номером. Дальше номера для той же основы выдаются
+по счётчику в памяти, так что серия заметок с одинаковым
+заголовком не перечитывает занятые slug. Окончательно уникальность
+гарантирует ограничение в базе, поэтому при гонке сохранение
+повторяется со следующим свободным номером.
+"""
+import re
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length
+from pytils.translit import slugify
+
+SLUG_CACHE_SIZE = 4096
+SAVE_ATTEMPTS = 5
+DEFAULT_BASE = 'note'
+# Номера без ведущих нулей: только их и выдаёт SlugAllocator.
+NUMBERED = re.compile(r'(.+)-([1-9][0-9]*)')
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def slugify_title(title, max_length):
+    """Транслитерация заголовка; повторы берутся из кеша."""
+    return slugify(title)[:max_length] or DEFAULT_BASE
+
+
+def slug_candidates_filter(base):
+    """Условие на slug вида base и base-N."""
+    # Все base-N лежат в индексе между 'base-' и 'base.'.
+    return Q(slug=base) | Q(slug__gte=f'{base}-', slug__lt=f'{base}.')
+
+
+def slug_candidates(queryset, base):
+    """base, если он занят, и base-N с наибольшим номером.
+
+    Среди номеров без ведущих нулей больший длиннее, а при равной
+    длине больше и как строка.
+    """
+    numbered = Q(
+        slug__gte=f'{base}-', slug__lt=f'{base}.',
+        slug__regex=rf'^{re.escape(base)}-[1-9][0-9]*$'
+    )
+    return queryset.filter(Q(slug=base) | numbered).order_by(
+        Case(
+            When(slug=base, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField()
+        ),
+        Length('slug').desc(),
+        '-slug'
+    ).values_list('slug', flat=True)[:2]
+
+
+def next_suffix(taken, base):
+    """Следующий номер для base по занятым slug или None, если base свободен.
+
+    taken — занятые slug вида base и base-N, другие не учитываются.
+    """
+    base_taken = False
+    highest = 1
+    for slug in taken:
+        if slug == base:
+            base_taken = True
+            continue
+        match = NUMBERED.fullmatch(slug)
+        if match and match.group(1) == base:
+            highest = max(highest, int(match.group(2)))
+    return highest + 1 if base_taken else None
+
+
+def group_by_base(slugs, bases):
+    """Занятые slug вида base и base-N для каждой основы из bases."""
+    groups = {base: [] for base in bases}
+    for slug in slugs:
+        if slug in groups:
+            groups[slug].append(slug)
+        match = NUMBERED.fullmatch(slug)
+        if match and match.group(1) in groups:
+            groups[match.group(1)].append(slug)
+    return groups
+
+
+class SlugAllocator:
+    """Выдаёт свободные slug, помня следующий номер каждой основы.
+
+    Номер основы читается из базы при первом обращении к ней или
+    задаётся заранее через load(). В taken копятся все известные
+    занятые slug: прочитанные из базы, заданные в том же запросе
+    и уже выданные. Выданный для одной основы slug может оказаться
+    номером другой: «foo-2» — и второй номер основы foo, и сама основа
+    заголовка «foo 2». Поэтому кандидат, который есть в taken,
+    пропускается, какая бы основа его ни заняла.
+    """
+
+    def __init__(self, queryset, max_length, taken=()):
+        self.queryset = queryset
+        self.max_length = max_length
+        self.taken = set(taken)
+        self.suffixes = {}
+
+    def load(self, base, taken):
+        self.suffixes[base] = next_suffix(taken, base)
+
+    def allocate(self, base):
+        if base not in self.suffixes:
+            self.taken.update(slug_candidates(self.queryset, base))
+            self.load(base, group_by_base(self.taken, (base,))[base])
+        while True:
+            suffix = self.suffixes[base]
+            slug = base if suffix is None else f'{base}-{suffix}'
+            if len(slug) > self.max_length:
+                # Номер не помещается: укорачиваем основу и ищем заново.
+                return self.allocate(base[:self.max_length - len(slug)])
+            self.suffixes[base] = 2 if suffix is None else suffix + 1
+            if slug not in self.taken:
+                self.taken.add(slug)
+                return slug
+
+
+def next_free_slug(queryset, base, max_length):
+    """base, если он свободен, иначе base-N со следующим номером."""
+    return SlugAllocator(queryset, max_length).allocate(base)
+
+
+def save_with_unique_slug(instance, save):
+    """Сохраняет объект со свободным slug, полученным из заголовка."""
+    model = type(instance)
+    max_length = model._meta.get_field('slug').max_length
+    base = slugify_title(instance.title, max_length)
+    others = model._default_manager.exclude(pk=instance.pk)
+    for attempt in range(SAVE_ATTEMPTS):
+        instance.slug = next_free_slug(others, base, max_length)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            # Slug успели занять между проверкой и вставкой.
+            instance.slug = ''
+            if attempt == SAVE_ATTEMPTS - 1:
+                raise
@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 
 from notes.models import Note
+from yanote.usercache import user_cache
 
 User = get_user_model()
 
@@ -29,6 +31,12 @@ class TestNoteBaseClass(TestCase):
         cls.reader_client = Client()
         cls.reader_client.force_login(cls.reader)
 
+    def setUp(self):
+        # Корзины ограничения частоты записи и пользователи из кеша
+        # процесса не должны переживать тест.
+        cache.clear()
+        user_cache.clear()
+
 
 class TestNoteBaseClassWithCreation(TestNoteBaseClass):
     @classmethod
@@ -0,0 +1,159 @@
+import json
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.bulk import SLUG_NOT_STRING
+from notes.forms import WARNING
+from notes.models import Note
+from notes.search import search_notes
+from notes.tests.conftest import DEFAULT_SLAG, TestNoteBaseClassWithCreation
+
+NOTES_BULK_ADD_URL = reverse('notes:bulk_add')
+NOTES_BULK_EDIT_URL = reverse('notes:bulk_edit')
+NOTES_BULK_DELETE_URL = reverse('notes:bulk_delete')
+
+
+class TestNotesBulk(TestNoteBaseClassWithCreation):
+
+    def post(self, url, items, client=None):
+        return (client or self.author_client).post(
+            url, json.dumps(items), content_type='application/json'
+        )
+
+    def test_create(self):
+        response = self.post(NOTES_BULK_ADD_URL, [
+            {'title': 'Первая', 'text': 'Текст', 'slug': 'first'},
+            {'title': 'Повтор', 'text': 'Текст'},
+            {'title': 'Повтор', 'text': 'Текст'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json(),
+                         {'created': ['first', 'povtor', 'povtor-2']})
+        self.assertEqual(
+            Note.objects.filter(author=self.author).count(), 4
+        )
+        self.assertEqual(
+            search_notes(Note.objects.all(), 'Повтор').count(), 2
+        )
+
+    def test_create_numbers_continue_within_request(self):
+        Note.objects.create(title='Повтор', text='Текст', author=self.author)
+        response = self.post(NOTES_BULK_ADD_URL, [
+            {'title': 'Повтор', 'text': 'Текст'},
+            {'title': 'Задан', 'text': 'Текст', 'slug': 'povtor-3'},
+            {'title': 'Повтор', 'text': 'Текст'},
+            {'title': 'Повтор', 'text': 'Текст'},
+        ])
+        self.assertEqual(response.json(), {'created': [
+            'povtor-4', 'povtor-3', 'povtor-5', 'povtor-6'
+        ]})
+
+    def test_create_numbers_do_not_clash_across_bases(self):
+        # «foo-2» — и второй номер основы foo, и основа заголовка «foo 2»
+        Note.objects.create(title='foo', text='Текст', author=self.author)
+        response = self.post(NOTES_BULK_ADD_URL, [
+            {'title': 'foo', 'text': 'a'},
+            {'title': 'foo 2', 'text': 'b'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json(), {'created': ['foo-2', 'foo-2-2']})
+
+    def test_create_errors_by_item(self):
+        response = self.post(NOTES_BULK_ADD_URL, [
+            {'title': 'Занят', 'text': 'Текст', 'slug': DEFAULT_SLAG},
+            {'title': 'Хорошая', 'text': 'Текст'},
+            {'title': 'Без текста'},
+            {'title': 'Дубль', 'text': 'Текст', 'slug': 'twice'},
+            {'title': 'Дубль', 'text': 'Текст', 'slug': 'twice'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        errors = response.json()['errors']
+        self.assertEqual(sorted(errors), ['0', '2', '3', '4'])
+        self.assertEqual(errors['0'], {'slug': [DEFAULT_SLAG + WARNING]})
+        self.assertIn('text', errors['2'])
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_create_queries_do_not_grow(self):
+        def count_queries(size, offset):
+            items = [
+                {'title': f'Заметка {index}', 'text': 'Текст',
+                 'slug': f'note-{index}' if index % 2 else ''}
+                for index in range(offset, offset + size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(NOTES_BULK_ADD_URL, items)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            return len(queries)
+
+        # Первый запрос кладёт пользователя в кеш процесса.
+        count_queries(1, 1000)
+        self.assertEqual(count_queries(10, 0), count_queries(150, 10))
+
+    def test_too_many_items(self):
+        with self.settings(NOTES_BULK_MAX_ITEMS=1):
+            response = self.post(NOTES_BULK_ADD_URL, [{}, {}])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('__all__', response.json()['errors'])
+
+    def test_update(self):
+        response = self.post(NOTES_BULK_EDIT_URL, [
+            {'slug': DEFAULT_SLAG, 'title': 'Новый заголовок',
+             'new_slug': 'renamed'},
+        ])
+        self.assertEqual(response.json(), {'updated': ['renamed']})
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(note.title, 'Новый заголовок')
+        self.assertEqual(note.text, self.note.text)
+        self.assertGreater(note.updated, self.note.updated)
+        self.assertEqual(
+            search_notes(Note.objects.all(), 'Новый').get(), note
+        )
+
+    def test_update_errors_by_item(self):
+        other = Note.objects.create(title='Чужая', text='Текст',
+                                    slug='other', author=self.reader)
+        response = self.post(NOTES_BULK_EDIT_URL, [
+            {'slug': DEFAULT_SLAG, 'new_slug': other.slug},
+            {'slug': other.slug, 'title': 'Не моя'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(sorted(response.json()['errors']), ['0', '1'])
+        self.assertEqual(Note.objects.get(pk=other.pk).title, 'Чужая')
+
+    def test_update_slug_must_be_string(self):
+        response = self.post(NOTES_BULK_EDIT_URL, [
+            {'slug': [DEFAULT_SLAG], 'title': 'Список'},
+            {'title': 'Без slug'},
+            {'slug': DEFAULT_SLAG, 'title': 'Новый заголовок'},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        errors = response.json()['errors']
+        self.assertEqual(sorted(errors), ['0', '1'])
+        self.assertEqual(errors['0'], {'slug': [SLUG_NOT_STRING]})
+        self.assertEqual(Note.objects.get().title, self.note.title)
+
+    def test_delete(self):
+        response = self.post(NOTES_BULK_DELETE_URL, [DEFAULT_SLAG])
+        self.assertEqual(response.json(), {'deleted': [DEFAULT_SLAG]})
+        self.assertFalse(Note.objects.exists())
+        self.assertFalse(
+            search_notes(Note.objects.all(), 'Заголовок').exists()
+        )
+
+    def test_delete_missing_changes_nothing(self):
+        response = self.post(NOTES_BULK_DELETE_URL, [DEFAULT_SLAG, 'nope'])
+        self.assertEqual(response.json(),
+                         {'errors': {'1': {'slug': ['Заметка не найдена.']}}})
+        response = self.post(
+            NOTES_BULK_DELETE_URL, [DEFAULT_SLAG], self.reader_client
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertTrue(Note.objects.exists())
+
+    def test_get_not_allowed(self):
+        response = self.author_client.get(NOTES_BULK_ADD_URL)
+        self.assertEqual(response.status_code,
+                         HTTPStatus.METHOD_NOT_ALLOWED)
@@ -1,4 +1,10 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import override_settings
+
 from notes.forms import NoteForm
+from notes.models import Note
 from notes.tests.conftest import (TestNoteBaseClassWithCreation,
                                   NOTES_LIST_URL,
                                   NOTES_ADD_URL,
@@ -26,3 +32,74 @@ class TestNoteList(TestNoteBaseClassWithCreation):
                 response = self.author_client.get(NOTES_EDIT_URL)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestNotesListPages(TestNoteBaseClassWithCreation):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.notes = [cls.note] + [
+            Note.objects.create(title=f'Заметка {index}', text='Текст',
+                                author=cls.author)
+            for index in range(4)
+        ]
+
+    @override_settings(NOTES_PAGE_SIZE=2)
+    def test_pages_follow_after(self):
+        shown = []
+        params = {}
+        while True:
+            response = self.author_client.get(NOTES_LIST_URL, params)
+            shown.extend(response.context['object_list'])
+            if response.context['next_after'] is None:
+                break
+            params = {'after': response.context['next_after']}
+        self.assertEqual(shown, self.notes)
+
+    def test_list_does_not_load_text(self):
+        response = self.author_client.get(NOTES_LIST_URL)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
+    def test_invalid_after(self):
+        for after in ('x', '999999999999999999999', '-999999999999999999999'):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    NOTES_LIST_URL, {'after': after}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class TestNotesSearch(TestNoteBaseClassWithCreation):
+
+    def search(self, query, client=None):
+        response = (client or self.author_client).get(
+            NOTES_LIST_URL, {'q': query}
+        )
+        return response.context['object_list']
+
+    def test_search_title_and_text(self):
+        other = Note.objects.create(title='Покупки', text='Молоко и хлеб',
+                                    author=self.author)
+        self.assertEqual(self.search('покуп'), [other])
+        self.assertEqual(self.search('хлеб'), [other])
+        self.assertEqual(self.search('хлеб "молоко'), [other])
+        self.assertEqual(self.search('хлеб', self.reader_client), [])
+
+    def test_search_follows_changes(self):
+        self.note.text = 'Совсем другой текст'
+        self.note.save()
+        self.assertEqual(self.search('другой'), [self.note])
+        self.note.delete()
+        self.assertEqual(self.search('другой'), [])
+
+    def test_search_follows_writes_without_models(self):
+        # Индекс обновляют триггеры базы, а не код приложения
+        Note.objects.filter(pk=self.note.pk).update(text='Обновлённый')
+        self.assertEqual(self.search('обновлённый'), [self.note])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM notes_note WHERE id = %s', (self.note.pk,)
+            )
+        self.assertEqual(self.search('обновлённый'), [])
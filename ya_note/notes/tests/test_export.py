@@ -0,0 +1,114 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.export import export_notes
+from notes.models import Note
+from notes.tests.conftest import (TestNoteBaseClassWithCreation,
+                                  NOTES_LIST_URL)
+
+User = get_user_model()
+
+NOTES_EXPORT_URL = reverse('notes:export')
+# Сколько заметок выгружать в тесте памяти.
+MEMORY_TEST_ROWS = int(os.environ.get('NOTES_EXPORT_TEST_ROWS', 1_000_000))
+# Порог с запасом: одна порция строк из базы, буфер и сжатие.
+MEMORY_LIMIT = 8 * 1024 * 1024
+
+
+def read_content(response):
+    return b''.join(response.streaming_content)
+
+
+class TestNotesExport(TestNoteBaseClassWithCreation):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Note.objects.create(title='Чужая', text='Текст', slug='other',
+                            author=cls.reader)
+
+    def test_csv(self):
+        response = self.author_client.get(NOTES_EXPORT_URL)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(read_content(response).decode())))
+        self.assertEqual(rows[0], ['id', 'title', 'slug', 'text', 'updated'])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][:3], [str(self.note.pk), self.note.title,
+                                       self.note.slug])
+
+    def test_jsonl_gzip(self):
+        response = self.author_client.get(
+            NOTES_EXPORT_URL, {'format': 'jsonl', 'gzip': '1'}
+        )
+        self.assertIn('notes.jsonl.gz', response['Content-Disposition'])
+        lines = gzip.decompress(read_content(response)).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['text'], self.note.text)
+
+    def test_unknown_format(self):
+        response = self.author_client.get(NOTES_EXPORT_URL, {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_anonymous_redirect(self):
+        response = self.client.get(NOTES_EXPORT_URL)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_list_links_to_export(self):
+        response = self.author_client.get(NOTES_LIST_URL)
+        self.assertContains(response, NOTES_EXPORT_URL)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.jsonl')
+            call_command('export_notes', self.author.username,
+                         format='jsonl', output=path, chunk_size=1)
+            with open(path, encoding='utf-8') as output:
+                notes = [json.loads(line) for line in output]
+        self.assertEqual([note['slug'] for note in notes], [self.note.slug])
+
+
+class TestNotesExportMemory(TestCase):
+    """Память выгрузки не растёт с числом заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        # Через модели миллион заметок создавался бы слишком долго.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'WITH RECURSIVE seq(n) AS ('
+                ' SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s'
+                ') INSERT INTO notes_note (title, text, slug, author_id, '
+                'updated) SELECT \'Заметка \' || n, \'Текст заметки \' || n, '
+                '\'note-\' || n, %s, %s FROM seq',
+                (MEMORY_TEST_ROWS, cls.author.pk, timezone.now())
+            )
+
+    def test_peak_memory(self):
+        tracemalloc.start()
+        try:
+            size = sum(
+                len(chunk) for chunk in export_notes(
+                    Note.objects.filter(author=self.author), 'csv', True,
+                    settings.NOTES_EXPORT_CHUNK_SIZE
+                )
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(size, MEMORY_TEST_ROWS)
+        self.assertLess(peak, MEMORY_LIMIT)
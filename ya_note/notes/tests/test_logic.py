@@ -1,9 +1,11 @@
 from http import HTTPStatus
+from unittest import mock
 
 from django.conf import settings
 from pytils.translit import slugify
 
-from notes.forms import WARNING
+from notes import slugs
+from notes.forms import WARNING, NoteForm
 from notes.models import Note
 from notes.tests.conftest import (TestNoteBaseClass,
                                   TestNoteBaseClassWithCreation,
@@ -28,6 +30,58 @@ class TestNoteCreate(TestNoteBaseClass):
         # Проверяем, что slug заметки соответствует ожидаемому:
         self.assertEqual(new_note.slug, expected_slug)
 
+    def test_empty_slug_for_repeated_title(self):
+        # Повторный заголовок получает slug со следующим номером
+        Note.objects.all().delete()
+        self.form_data.pop('slug')
+        for _ in range(3):
+            self.author_client.post(NOTES_ADD_URL, data=self.form_data)
+        expected_slug = slugify(self.form_data['title'])
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            [expected_slug, f'{expected_slug}-2', f'{expected_slug}-3']
+        )
+
+    def test_empty_slug_race_is_retried(self):
+        # Slug заняли между проверкой и вставкой: берётся следующий
+        Note.objects.all().delete()
+        taken = Note.objects.create(title=self.form_data['title'],
+                                    text='Текст', author=self.author)
+        free_slug = f'{taken.slug}-2'
+        with mock.patch.object(slugs, 'next_free_slug',
+                               side_effect=(taken.slug, free_slug)):
+            note = Note.objects.create(title=self.form_data['title'],
+                                       text='Текст', author=self.author)
+        self.assertEqual(note.slug, free_slug)
+
+    def test_next_free_slug_reads_highest_number(self):
+        # Из базы приходят только base и base-N с наибольшим номером
+        for slug in ('base', 'base-9', 'base-10', 'base-abc', 'base-011'):
+            Note.objects.create(title='Заголовок', text='Текст', slug=slug,
+                                author=self.author)
+        max_length = Note._meta.get_field('slug').max_length
+        with self.assertNumQueries(1):
+            slug = slugs.next_free_slug(Note.objects.all(), 'base',
+                                        max_length)
+        self.assertEqual(slug, 'base-11')
+        self.assertEqual(
+            slugs.next_free_slug(Note.objects.all(), 'base-abc', max_length),
+            'base-abc-2'
+        )
+
+    def test_long_title_slug_fits(self):
+        Note.objects.all().delete()
+        title = 'Очень длинный заголовок ' * 5
+        max_length = Note._meta.get_field('slug').max_length
+        notes = [
+            Note.objects.create(title=title[:100], text='Текст',
+                                author=self.author)
+            for _ in range(2)
+        ]
+        self.assertEqual(len(notes[0].slug), max_length)
+        self.assertLessEqual(len(notes[1].slug), max_length)
+        self.assertNotEqual(notes[0].slug, notes[1].slug)
+
     def test_anonymous_user_cant_create_note(self):
         excepted_notes_count = Note.objects.count()
         response = self.client.post(NOTES_ADD_URL, self.form_data)
@@ -62,6 +116,19 @@ class TestNote(TestNoteBaseClassWithCreation):
         # Убеждаемся, что количество заметок в базе осталось равным 1:
         self.assertEqual(Note.objects.count(), excepted_notes_count)
 
+    def test_not_unique_slug_race(self):
+        # Совпадение, пропущенное проверкой формы, ловит ограничение базы
+        excepted_notes_count = Note.objects.count()
+        self.form_data['slug'] = self.note.slug
+        with mock.patch.object(NoteForm, 'clean_slug',
+                               lambda form: form.cleaned_data['slug']), \
+                mock.patch.object(Note, 'validate_unique'):
+            response = self.author_client.post(NOTES_ADD_URL,
+                                               data=self.form_data)
+        self.assertFormError(response, 'form', 'slug',
+                             errors=(self.note.slug + WARNING))
+        self.assertEqual(Note.objects.count(), excepted_notes_count)
+
     def test_author_can_edit_note(self):
         # В POST-запросе на адрес редактирования заметки
         # отправляем form_data - новые значения для полей заметки:
@@ -0,0 +1,62 @@
+import re
+from unittest import skipIf
+
+from django.db import connection
+from django.test import RequestFactory
+
+from notes import views
+from notes.models import Note
+from notes.search import search_notes
+from notes.slugs import slug_candidates
+from notes.tests.conftest import TestNoteBaseClassWithCreation
+
+FULL_SCAN = re.compile(r'^SCAN \S+$')
+
+
+@skipIf(connection.vendor != 'sqlite',
+        'План запроса проверяется только для SQLite.')
+class TestQueryPlans(TestNoteBaseClassWithCreation):
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def make_view(self, view_class, **kwargs):
+        request = RequestFactory().get('/')
+        request.user = self.author
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view
+
+    def test_view_querysets_use_indexes(self):
+        slug = self.note.slug
+        querysets = {
+            'list': self.make_view(views.NotesList).get_queryset(),
+            'detail': self.make_view(
+                views.NoteDetail, slug=slug
+            ).get_queryset().filter(slug=slug),
+            'edit': self.make_view(
+                views.NoteUpdate, slug=slug
+            ).get_queryset().filter(slug=slug),
+            'delete': self.make_view(
+                views.NoteDelete, slug=slug
+            ).get_queryset().filter(slug=slug),
+            'search': search_notes(
+                self.make_view(views.NotesList).get_queryset(), 'текст'
+            ),
+        }
+        for name, queryset in querysets.items():
+            plan = self.explain(queryset)
+            for step in plan:
+                with self.subTest(view=name, step=step):
+                    self.assertIsNone(FULL_SCAN.match(step), plan)
+                    self.assertNotIn('TEMP B-TREE', step, plan)
+
+    def test_slug_candidates_use_index(self):
+        # Сортируются только slug из диапазона base-N, а не вся таблица.
+        plan = self.explain(slug_candidates(Note.objects.all(), 'base'))
+        for step in plan:
+            with self.subTest(step=step):
+                self.assertIsNone(FULL_SCAN.match(step), plan)
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import override_settings
+
+from notes.models import Note
+from notes.tests.conftest import NOTES_ADD_URL, TestNoteBaseClass
+
+
+@override_settings(RATE_LIMITS={'notes:add': (0.001, 2)})
+class TestNoteRateLimit(TestNoteBaseClass):
+
+    def test_throttled_note_gets_429(self):
+        for index in range(2):
+            self.author_client.post(
+                NOTES_ADD_URL, data={**self.form_data, 'slug': f'n{index}'}
+            )
+        # Отказ не стоит ни одного запроса к базе.
+        with self.assertNumQueries(0):
+            response = self.author_client.post(
+                NOTES_ADD_URL, data={**self.form_data, 'slug': 'n2'}
+            )
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Note.objects.count(), 2)
+
+    def test_limit_is_per_user(self):
+        for index in range(3):
+            self.author_client.post(
+                NOTES_ADD_URL, data={**self.form_data, 'slug': f'n{index}'}
+            )
+        response = self.reader_client.post(
+            NOTES_ADD_URL, data={**self.form_data, 'slug': 'reader'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.author_client.get(NOTES_ADD_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def login_again(self, number):
+        """Вход с новой cookie сессии, как после повторного входа."""
+        self.author_client.force_login(self.author)
+        session = self.author_client.session
+        session['login'] = number
+        session.save()
+        self.author_client.cookies[settings.SESSION_COOKIE_NAME] = (
+            session.session_key
+        )
+
+    def test_limit_survives_relogin(self):
+        for index in range(3):
+            self.login_again(index)
+            response = self.author_client.post(
+                NOTES_ADD_URL, data={**self.form_data, 'slug': f'n{index}'}
+            )
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    @override_settings(RATE_LIMIT_IP_FACTOR=1)
+    def test_address_has_own_bucket(self):
+        for index in range(2):
+            self.author_client.post(
+                NOTES_ADD_URL, data={**self.form_data, 'slug': f'n{index}'}
+            )
+        response = self.reader_client.post(
+            NOTES_ADD_URL, data={**self.form_data, 'slug': 'reader'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
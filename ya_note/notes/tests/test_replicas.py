@@ -0,0 +1,64 @@
+import tempfile
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+
+from notes.models import Note
+from notes.tests.conftest import NOTES_ADD_URL, NOTES_LIST_URL
+from yanote.middleware import PIN_COOKIE
+from yanote.usercache import user_cache
+
+User = get_user_model()
+
+
+# В транзакции теста маршрутизатор читал бы только из основной базы.
+class TestReplicaRouting(TransactionTestCase):
+
+    def setUp(self):
+        # Реплика — отдельный файл SQLite, куда ничего не реплицируется.
+        self.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings['replica'] = {
+            'ENGINE': connections.settings['default']['ENGINE'],
+            'NAME': f'{self.replica_dir.name}/replica.sqlite3',
+        }
+        call_command('migrate', database='replica', verbosity=0)
+        replicas = override_settings(DATABASE_REPLICAS=['replica'])
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+        self.author = User.objects.create(username='Автор')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.form_data = {'title': 'Заголовок', 'text': 'Текст'}
+        user_cache.clear()
+
+    def tearDown(self):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        self.replica_dir.cleanup()
+
+    def test_list_after_create_reads_primary(self):
+        response = self.author_client.post(NOTES_ADD_URL, self.form_data)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.author_client.get(NOTES_LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, self.form_data['title'])
+
+    def test_reads_go_to_replica(self):
+        Note.objects.using('replica').create(
+            title='С реплики', text='Текст', slug='replica',
+            author=User.objects.using('replica').create(username='Автор')
+        )
+        self.assertEqual(Note.objects.get().slug, 'replica')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        self.author_client.post(NOTES_ADD_URL, self.form_data)
+        # Пользователя на реплике нет: без закрепления и кеша
+        # пользователей клиент как бы не вошёл.
+        user_cache.clear()
+        response = self.author_client.get(NOTES_LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
@@ -1,10 +1,13 @@
 from http import HTTPStatus
+from unittest import mock
 
 from django.conf import settings
 
+from notes.models import Note
 from notes.tests.conftest import (TestNoteBaseClassWithCreation,
                                   NOTES_ADD_URL,
                                   NOTES_DELETE_URL,
+                                  NOTES_DETAIL_URL,
                                   NOTES_EDIT_URL,
                                   NOTES_LIST_URL,
                                   NOTES_SUCCESS_URL
@@ -56,3 +59,64 @@ class TestRoutes(TestNoteBaseClassWithCreation):
                 response = self.client.get(url)
                 # Проверяем, что редирект приведёт именно на указанную ссылку.
                 self.assertRedirects(response, redirect_url)
+
+    def test_conditional_get_not_modified(self):
+        # Повторный запрос с валидаторами не отрисовывает шаблоны
+        for url in (NOTES_LIST_URL, NOTES_DETAIL_URL):
+            with self.subTest(url=url):
+                response = self.author_client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                response = self.author_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(response.templates, [])
+
+    def test_conditional_get_by_last_modified(self):
+        response = self.author_client.get(NOTES_DETAIL_URL)
+        response = self.author_client.get(
+            NOTES_DETAIL_URL,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response.templates, [])
+
+    def test_conditional_get_after_change(self):
+        # После изменения или удаления заметок страницы отдаются заново
+        changes = (
+            lambda: Note.objects.get(pk=self.note.pk).save(),
+            lambda: Note.objects.filter(pk=self.note.pk).delete(),
+        )
+        for url, change in zip((NOTES_DETAIL_URL, NOTES_LIST_URL), changes):
+            with self.subTest(url=url):
+                etag = self.author_client.get(url)['ETag']
+                change()
+                response = self.author_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_list_conditional_get_without_cached_version(self):
+        # Запись в другом процессе не меняет версию в кеше этого
+        changes = (
+            lambda: Note.objects.create(
+                title='Из другого процесса', text='Текст', author=self.author
+            ),
+            lambda: Note.objects.get(pk=self.note.pk).save(),
+            lambda: Note.objects.filter(pk=self.note.pk).delete(),
+        )
+        for change in changes:
+            with self.subTest(change=change):
+                etag = self.author_client.get(NOTES_LIST_URL)['ETag']
+                with mock.patch('notes.signals.bump_notes_version'):
+                    change()
+                response = self.author_client.get(
+                    NOTES_LIST_URL, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_query_budget_header(self):
+        response = self.author_client.get(NOTES_LIST_URL)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
@@ -0,0 +1,37 @@
+from django.urls import reverse
+
+from notes.tests.conftest import NOTES_LIST_URL, TestNoteBaseClassWithCreation
+from yanote.usercache import user_cache
+
+
+class TestSessions(TestNoteBaseClassWithCreation):
+
+    def user_key(self):
+        return self.author._meta.pk.value_to_string(self.author)
+
+    def test_list_queries(self):
+        """Сессия не читается из базы, пользователь — только первый раз.
+
+        Остаются два запроса: состояние заметок для условного запроса
+        и сами заметки автора.
+        """
+        with self.assertNumQueries(3):
+            self.author_client.get(NOTES_LIST_URL)
+        with self.assertNumQueries(2):
+            self.author_client.get(NOTES_LIST_URL)
+
+    def test_password_change_ends_cached_sessions(self):
+        self.author_client.get(NOTES_LIST_URL)
+        self.assertIn(self.user_key(), user_cache.users)
+        self.author.set_password('Новый пароль')
+        self.author.save()
+        self.assertNotIn(self.user_key(), user_cache.users)
+        response = self.author_client.get(NOTES_LIST_URL)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={NOTES_LIST_URL}'
+        )
+
+    def test_logout_drops_cached_user(self):
+        self.author_client.get(NOTES_LIST_URL)
+        self.author_client.get(reverse('users:logout'))
+        self.assertNotIn(self.user_key(), user_cache.users)
@@ -0,0 +1,76 @@
+import importlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from yanote.template_cache import project_template_names, warm_templates
+
+
+def load_production_settings(secret_key):
+    """Заново импортирует рабочий профиль с заданным окружением."""
+    sys.modules.pop('yanote.settings_production', None)
+    with mock.patch.dict(os.environ):
+        os.environ.pop('DJANGO_SECRET_KEY', None)
+        if secret_key is not None:
+            os.environ['DJANGO_SECRET_KEY'] = secret_key
+        return importlib.import_module('yanote.settings_production')
+
+
+settings_production = load_production_settings('ключ')
+
+
+class TestTemplates(SimpleTestCase):
+
+    def test_check_templates_command(self):
+        """Все шаблоны проекта разбираются без ошибок."""
+        stdout = io.StringIO()
+        call_command('check_templates', stdout=stdout)
+        self.assertIn(
+            f'разобрано: {len(project_template_names())}', stdout.getvalue()
+        )
+
+    def test_check_templates_reports_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            (directory / 'good.html').write_text(
+                '{% include "broken.html" %}'
+            )
+            (directory / 'broken.html').write_text('{% if %}')
+            (directory / 'missing.html').write_text(
+                '{% extends "nope.html" %}'
+            )
+            stderr = io.StringIO()
+            with override_settings(TEMPLATES=[
+                {**settings.TEMPLATES[0], 'DIRS': [directory]}
+            ]):
+                with self.assertRaisesMessage(CommandError, '2 из 3'):
+                    call_command(
+                        'check_templates', stdout=io.StringIO(), stderr=stderr
+                    )
+        errors = stderr.getvalue().splitlines()
+        self.assertTrue(errors[0].startswith('broken.html:'))
+        self.assertEqual(errors[1], 'missing.html: нет шаблона nope.html')
+
+    def test_production_secret_key_from_environment(self):
+        # Рабочий профиль не запускается с ключом из репозитория
+        with self.assertRaises(ImproperlyConfigured):
+            load_production_settings(None)
+        self.assertEqual(load_production_settings('ключ').SECRET_KEY, 'ключ')
+
+    @override_settings(TEMPLATES=settings_production.TEMPLATES)
+    def test_warm_templates_fills_cached_loader(self):
+        loader, = engines['django'].engine.template_loaders
+        names = project_template_names()
+        self.assertEqual(warm_templates(budget=0), 0)
+        self.assertFalse(loader.get_template_cache)
+        self.assertEqual(warm_templates(budget=60), len(names))
+        self.assertEqual(set(loader.get_template_cache), set(names))
@@ -11,5 +11,17 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('notes/export/', views.NotesExport.as_view(), name='export'),
+    path(
+        'notes/bulk/add/', views.NotesBulkCreate.as_view(), name='bulk_add'
+    ),
+    path(
+        'notes/bulk/edit/', views.NotesBulkUpdate.as_view(), name='bulk_edit'
+    ),
+    path(
+        'notes/bulk/delete/',
+        views.NotesBulkDelete.as_view(),
+        name='bulk_delete'
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
@@ -1,9 +1,29 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.db import IntegrityError, transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
-
-from .forms import NoteForm
+from django.views.decorators.http import condition
+
+from .bulk import (
+    BulkError, create_notes, delete_notes, parse_items, update_notes
+)
+from .conditional import (
+    note_etag, note_last_modified, notes_list_etag, notes_list_last_modified
+)
+from .export import FORMATS, export_filename, export_notes
+from .forms import WARNING, NoteForm
 from .models import Note
+from .search import search_notes
+
+# Допустимые значения id заметки: большее число база не примет.
+NOTE_ID_RANGE = BaseDatabaseOperations.integer_field_ranges['BigAutoField']
 
 
 class Home(generic.TemplateView):
@@ -26,22 +46,31 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormMixin:
+    """Сохранение заметки из формы."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Заданный slug могли занять уже после проверки формы."""
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.cleaned_data['slug'] + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -49,11 +78,128 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+@method_decorator(
+    condition(
+        etag_func=notes_list_etag,
+        last_modified_func=notes_list_last_modified
+    ),
+    name='get'
+)
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
-    template_name = 'notes/list.html'
+    """Список заметок пользователя постранично, с поиском.
 
+    Страница выбирается по id последней показанной заметки,
+    поэтому её стоимость не зависит от того, насколько она далеко.
+    """
+    template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """Текст заметок в списке не выводится и не загружается."""
+        queryset = super().get_queryset().only(
+            'id', 'title', 'slug'
+        ).order_by('id')
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            queryset = search_notes(queryset, query)
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                after = int(after)
+            except ValueError:
+                raise BadRequest('Некорректный параметр after.')
+            low, high = NOTE_ID_RANGE
+            if not low <= after <= high:
+                raise BadRequest('Некорректный параметр after.')
+            queryset = queryset.filter(id__gt=after)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        page_size = settings.NOTES_PAGE_SIZE
+        page = list(self.object_list[:page_size + 1])
+        next_after = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            next_after = page[-1].pk
+        return super().get_context_data(
+            object_list=page,
+            next_after=next_after,
+            query=self.request.GET.get('q', ''),
+            **kwargs
+        )
+
+
+class NotesBulkBase(NoteBase, generic.View):
+    """Массовая операция: список элементов JSON в теле запроса.
+
+    При ошибке в любом элементе не меняется ничего, а в ответе
+    приходят ошибки по номерам элементов.
+    """
+    http_method_names = ('post',)
+    item_type = dict
+
+    def post(self, request, *args, **kwargs):
+        try:
+            result = self.apply(parse_items(request.body, self.item_type))
+        except BulkError as error:
+            return JsonResponse(
+                {'errors': error.errors}, status=HTTPStatus.BAD_REQUEST
+            )
+        return JsonResponse(result)
+
+
+class NotesBulkCreate(NotesBulkBase):
+    """Элементы — поля заметки: title, text и необязательный slug."""
+
+    def apply(self, items):
+        return {'created': create_notes(self.request.user, items)}
+
+
+class NotesBulkUpdate(NotesBulkBase):
+    """Элементы — slug заметки и новые title, text или new_slug."""
+
+    def apply(self, items):
+        return {'updated': update_notes(self.request.user, items)}
+
+
+class NotesBulkDelete(NotesBulkBase):
+    """Элементы — slug удаляемых заметок."""
+    item_type = str
+
+    def apply(self, items):
+        return {'deleted': delete_notes(self.request.user, items)}
+
+
+class NotesExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя потоком, без загрузки в память.
+
+    Параметры: format — csv или jsonl, gzip — сжать выгрузку.
+    """
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'csv')
+        if file_format not in FORMATS:
+            raise BadRequest('Некорректный параметр format.')
+        compress = 'gzip' in request.GET
+        response = StreamingHttpResponse(
+            export_notes(
+                self.get_queryset(), file_format, compress,
+                settings.NOTES_EXPORT_CHUNK_SIZE
+            ),
+            content_type=(
+                'application/gzip' if compress else FORMATS[file_format]
+            )
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="'
+            f'{export_filename(file_format, compress)}"'
+        )
+        return response
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_last_modified),
+    name='get'
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
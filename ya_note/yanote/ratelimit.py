@@ -0,0 +1,69 @@
+"""Ограничение частоты запросов корзиной токенов.
+
+В корзине не больше burst токенов, она пополняется со скоростью rate
+токенов в секунду, и каждый запрос забирает один токен. Состояние
+корзины лежит в кеше Django под двумя ключами: момент начала отсчёта
+и число выданных токенов. Токен выдаётся атомарным cache.incr() без
+блокировок: запрос проходит, если с начала отсчёта накопилось
+не меньше токенов, чем выдано. При отказе токен возвращается.
+
+Получив отказ, процесс запоминает ключ до появления следующего токена
+и до этого момента отказывает сам, не обращаясь к кешу: поток
+запросов от одного клиента не нагружает ни кеш, ни базу.
+"""
+import time
+
+from django.core.cache import cache as default_cache
+
+# Корзина, которую не трогали столько секунд, заводится заново.
+BUCKET_TIMEOUT = 60 * 60
+# Сколько отказов процесс помнит, прежде чем выбросить истёкшие.
+MAX_BLOCKED = 10000
+
+
+class TokenBucketLimiter:
+    """Корзины токенов в кеше с локальной памятью об отказах."""
+
+    def __init__(self, cache=default_cache, clock=time.time):
+        self.cache = cache
+        self.clock = clock
+        # Словарь меняется только целыми операциями, их атомарность
+        # обеспечивает GIL.
+        self.blocked = {}
+
+    def acquire(self, key, rate, burst):
+        """Ноль, если токен выдан, иначе секунды до следующего токена."""
+        now = self.clock()
+        blocked_until = self.blocked.get(key, 0)
+        if blocked_until > now:
+            return blocked_until - now
+        start_key = f'ratelimit:{key}:start'
+        count_key = f'ratelimit:{key}:count'
+        start = self.cache.get(start_key)
+        try:
+            count = self.cache.incr(count_key)
+        except ValueError:
+            count = None
+        if (
+            start is None or count is None
+            or rate * (now - start) >= count - 1
+        ):
+            # Корзина полна: отсчёт начинается заново, иначе за время
+            # простоя накопилось бы больше burst токенов. Одновременные
+            # запросы к полной корзине могут пройти все — их не больше,
+            # чем параллельных запросов одного клиента.
+            self.cache.set_many(
+                {start_key: now, count_key: 1}, BUCKET_TIMEOUT
+            )
+            return 0
+        if burst + rate * (now - start) >= count:
+            return 0
+        self.cache.decr(count_key)
+        blocked_until = start + (count - burst) / rate
+        if len(self.blocked) >= MAX_BLOCKED:
+            self.blocked = {
+                key: until for key, until in self.blocked.items()
+                if until > now
+            }
+        self.blocked[key] = blocked_until
+        return blocked_until - now
@@ -22,11 +22,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.middleware.QueryBudgetMiddleware',
+    'yanote.middleware.PrimaryPinMiddleware',
+    'yanote.middleware.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yanote.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -51,14 +54,40 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
+# Прогрев шаблонов при старте, включён в settings_production.py.
+TEMPLATE_WARMUP_SECONDS = 0
+
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL и прагмы — в yanote/backends/sqlite3/base.py.
+        'ENGINE': 'yanote.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт в потоке обработчика между запросами.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики для чтения — псевдонимы из DATABASES, например:
+# DATABASES['replica'] = {'ENGINE': ..., 'NAME': ..., 'TEST': {'MIRROR':
+# 'default'}} и DATABASE_REPLICAS = ['replica'].
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['yanote.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Частота записи по имени URL: (токенов в секунду, запас корзины).
+RATE_LIMITS = {
+    'notes:add': (0.2, 10),
+    'notes:edit': (0.2, 10),
+    'notes:delete': (0.2, 10),
+    'notes:bulk_add': (0.05, 5),
+    'notes:bulk_edit': (0.05, 5),
+    'notes:bulk_delete': (0.05, 5),
+}
+# Во сколько раз корзина IP-адреса больше корзины пользователя.
+RATE_LIMIT_IP_FACTOR = 10
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -69,6 +98,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Сессия целиком в подписанной cookie: чтение сессии не стоит запроса
+# к базе. Выход очищает cookie у клиента, но сохранённая до выхода
+# копия cookie остаётся действительной до SESSION_COOKIE_AGE или смены
+# пароля.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+# Сколько секунд процесс доверяет пользователю из своего кеша,
+# см. yanote/usercache.py.
+AUTH_USER_CACHE_TTL = 30
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -87,3 +125,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+QUERY_BUDGET_SAMPLE_RATE = 1.0
+QUERY_BUDGET_DUPLICATE_THRESHOLD = 3
+QUERY_BUDGET_REPORT_PATH = None
+QUERY_BUDGET_FLUSH_INTERVAL = 60
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+NOTES_PAGE_SIZE = 50
+NOTES_EXPORT_CHUNK_SIZE = 2000
+# Элементов в одном запросе к массовым операциям.
+NOTES_BULK_MAX_ITEMS = 500
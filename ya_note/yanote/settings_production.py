@@ -0,0 +1,52 @@
+"""Рабочий профиль настроек.
+
+Запуск: DJANGO_SETTINGS_MODULE=yanote.settings_production.
+Шаблоны загружаются через cached.Loader и прогреваются при старте
+процесса, см. yanote/template_cache.py. Перед выкладкой стоит
+выполнить python manage.py check_templates.
+
+Секретный ключ задаётся переменной окружения DJANGO_SECRET_KEY, без неё
+процесс не запустится. Сессии хранятся в подписанной cookie, и ключ из
+settings.py, лежащий в репозитории, позволил бы подделать любую сессию.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401, F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured(
+        'Задайте секретный ключ в переменной окружения DJANGO_SECRET_KEY.'
+    )
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+# С явным списком загрузчиков APP_DIRS должен быть выключен,
+# app_directories.Loader подключён внутри кеширующего загрузчика.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]
+        )],
+    },
+}]
+
+# Сколько секунд процесс может потратить на прогрев шаблонов при старте.
+TEMPLATE_WARMUP_SECONDS = 2
+
+# Учёт запросов на каждом запросе стоит времени, в работе хватит выборки.
+QUERY_BUDGET_SAMPLE_RATE = 0.01
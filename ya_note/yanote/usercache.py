@@ -0,0 +1,82 @@
+"""Кеш пользователей в памяти процесса.
+
+Сессии хранятся в подписанной cookie (SESSION_ENGINE в settings.py)
+и читаются без базы, так что на аутентифицированный запрос остаётся
+один запрос — строка пользователя. CachedAuthenticationMiddleware
+берёт её из словаря процесса, если этот пользователь с тем же
+бэкендом и хешем аутентификации сессии уже проверялся не раньше
+AUTH_USER_CACHE_TTL секунд назад.
+
+Сохранение пользователя (в том числе смена пароля и last_login при
+входе) и выход убирают его из кеша этого процесса. Другие процессы
+узнают об изменении не позже чем через AUTH_USER_CACHE_TTL секунд.
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+# Сколько пользователей процесс помнит, прежде чем выбросить истёкших.
+MAX_USERS = 10000
+
+
+class UserCache:
+    """Проверенные пользователи по id с бэкендом и хешем сессии."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        # Словарь меняется только целыми операциями, их атомарность
+        # обеспечивает GIL.
+        self.users = {}
+
+    def get_user(self, request):
+        """Пользователь запроса, как в django.contrib.auth.get_user."""
+        session = request.session
+        try:
+            key = (
+                session[auth.SESSION_KEY],
+                session[auth.BACKEND_SESSION_KEY],
+                session[auth.HASH_SESSION_KEY],
+            )
+        except KeyError:
+            return auth.get_user(request)
+        now = self.clock()
+        entry = self.users.get(key[0])
+        if entry is not None and entry[0] == key and entry[2] > now:
+            # Копия: представление может менять свой request.user.
+            return copy.copy(entry[1])
+        user = auth.get_user(request)
+        if user.is_authenticated and settings.AUTH_USER_CACHE_TTL > 0:
+            if len(self.users) >= MAX_USERS:
+                self.users = {
+                    user_id: entry for user_id, entry in self.users.items()
+                    if entry[2] > now
+                }
+            self.users[key[0]] = (
+                key, copy.copy(user), now + settings.AUTH_USER_CACHE_TTL
+            )
+        return user
+
+    def invalidate(self, user):
+        self.users.pop(user._meta.pk.value_to_string(user), None)
+
+    def clear(self):
+        self.users = {}
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, **kwargs):
+    user_cache.invalidate(instance)
+
+
+@receiver(user_logged_out)
+def user_left(sender, request, user, **kwargs):
+    if user is not None:
+        user_cache.invalidate(user)
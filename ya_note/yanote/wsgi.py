@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from yanote.template_cache import warm_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
 application = get_wsgi_application()
+
+# Загружает шаблоны заранее, если TEMPLATE_WARMUP_SECONDS больше нуля.
+warm_templates()